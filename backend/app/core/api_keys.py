@@ -0,0 +1,198 @@
+"""
+LUXORANOVA API Key Authentication - Prefix lookup, keyed-hash verification, cache
+"""
+
+import hmac
+import logging
+from datetime import datetime, timezone
+from typing import List, NamedTuple, Optional, Protocol
+
+from prometheus_client import Counter
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.cache import TwoTierCache
+from app.core.config import settings
+from app.core.database import engine
+from app.core.password_hashing import password_hasher
+from app.core.security import (
+    api_key_needs_rehash,
+    get_api_key_prefix,
+    hash_api_key,
+)
+
+logger = logging.getLogger(__name__)
+
+API_KEY_AUTH = Counter(
+    "api_key_authentications_total",
+    "API key authentication attempts by outcome",
+    ["outcome"],
+)
+
+
+class APIKeyRecord(NamedTuple):
+    """Stored API key, as needed to authenticate a request."""
+    id: str
+    user_id: str
+    key_hash: str
+    expires_at: Optional[datetime] = None
+
+
+class APIKeyStore(Protocol):
+    """Persistence used by APIKeyAuthenticator."""
+    
+    async def get_by_prefix(self, prefix: str) -> List[APIKeyRecord]:
+        """Active (non-revoked) keys with the given lookup prefix."""
+        ...
+    
+    async def update_hash(self, key_id: str, key_hash: str) -> None:
+        """Replace the stored hash of a key."""
+        ...
+
+
+class SQLAPIKeyStore:
+    """
+    APIKeyStore over the ``api_keys`` table.
+    
+    Expects columns id, user_id, prefix, key_hash, expires_at and revoked_at,
+    with an index on prefix so each lookup is a single index probe.
+    """
+    
+    GET_BY_PREFIX = text(
+        "SELECT id, user_id, key_hash, expires_at FROM api_keys "
+        "WHERE prefix = :prefix AND revoked_at IS NULL"
+    )
+    UPDATE_HASH = text("UPDATE api_keys SET key_hash = :key_hash WHERE id = :id")
+    
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+    
+    async def get_by_prefix(self, prefix: str) -> List[APIKeyRecord]:
+        async with self.engine.connect() as conn:
+            result = await conn.execute(self.GET_BY_PREFIX, {"prefix": prefix})
+            return [
+                APIKeyRecord(str(row.id), str(row.user_id), row.key_hash, row.expires_at)
+                for row in result
+            ]
+    
+    async def update_hash(self, key_id: str, key_hash: str) -> None:
+        async with self.engine.begin() as conn:
+            await conn.execute(self.UPDATE_HASH, {"id": key_id, "key_hash": key_hash})
+
+
+class APIKeyAuthenticator:
+    """
+    Authenticate API keys without a password hash on the hot path.
+    
+    1. Recently verified keys are served from a bounded TTL cache keyed by
+       the key's HMAC, so the plain key is never held.
+    2. Otherwise the key's prefix selects candidate rows through an index
+       and the key is checked with a constant-time HMAC-SHA256 comparison.
+    3. Keys still stored as bcrypt hashes are verified once on the password
+       hashing pool and transparently rehashed with HMAC-SHA256.
+    
+    ``revoke(prefix)`` drops a key from the cache of every process (via
+    Redis pub/sub); call it whenever a key is revoked or deleted.
+    """
+    
+    def __init__(self, store: APIKeyStore, maxsize: int = 10_000, ttl: float = 60.0):
+        """
+        Args:
+            store: Where API keys are persisted
+            maxsize: Maximum number of cached verified keys
+            ttl: Seconds a verified key is trusted without a lookup; bounds
+                how long a revocation missed by pub/sub can go unnoticed
+        """
+        self.store = store
+        self.ttl = ttl
+        self.cache = TwoTierCache("api_keys", maxsize=maxsize, broadcast=True)
+    
+    async def start(self) -> None:
+        """Follow revocations from other processes (call from the app lifespan)."""
+        await self.cache.start()
+    
+    async def stop(self) -> None:
+        await self.cache.stop()
+    
+    async def authenticate(self, api_key: str) -> Optional[APIKeyRecord]:
+        """
+        Resolve an API key to its stored record.
+        
+        Args:
+            api_key: API key presented by the client
+        
+        Returns:
+            APIKeyRecord if the key is valid, None otherwise
+        
+        Raises:
+            PasswordHasherBusy: A legacy hash had to be verified while the hashing
+                pool was saturated; the application maps it to 503 + Retry-After
+        """
+        if not api_key.startswith(settings.API_KEY_PREFIX):
+            API_KEY_AUTH.labels("rejected").inc()
+            return None
+        
+        prefix = get_api_key_prefix(api_key)
+        key_hash = hash_api_key(api_key)
+        
+        record = await self.cache.get(prefix, key_hash)
+        if record is not None and not _expired(record):
+            API_KEY_AUTH.labels("cached").inc()
+            return record
+        
+        for candidate in await self.store.get_by_prefix(prefix):
+            if _expired(candidate):
+                continue
+            
+            if hmac.compare_digest(candidate.key_hash, key_hash):
+                API_KEY_AUTH.labels("verified").inc()
+                return await self._remember(prefix, key_hash, candidate)
+            
+            if api_key_needs_rehash(candidate.key_hash) and await password_hasher.verify(
+                api_key, candidate.key_hash
+            ):
+                API_KEY_AUTH.labels("migrated").inc()
+                await self._migrate(candidate, key_hash)
+                return await self._remember(prefix, key_hash, candidate._replace(key_hash=key_hash))
+        
+        API_KEY_AUTH.labels("rejected").inc()
+        return None
+    
+    async def revoke(self, prefix: str) -> None:
+        """
+        Forget cached verifications for the key(s) with this prefix.
+        
+        Args:
+            prefix: Lookup prefix of the revoked key
+        """
+        await self.cache.invalidate(prefix)
+    
+    async def _remember(self, prefix: str, key_hash: str, record: APIKeyRecord) -> APIKeyRecord:
+        ttl = self.ttl
+        if record.expires_at is not None:
+            ttl = min(ttl, (_as_utc(record.expires_at) - datetime.now(timezone.utc)).total_seconds())
+        if ttl > 0:
+            await self.cache.set(prefix, key_hash, record, ttl)
+        return record
+    
+    async def _migrate(self, record: APIKeyRecord, key_hash: str) -> None:
+        try:
+            await self.store.update_hash(record.id, key_hash)
+        except Exception as e:
+            # The key stays valid; migration is retried on its next cache miss
+            logger.error(f"API key hash migration failed for {record.id}: {str(e)}")
+
+
+def _expired(record: APIKeyRecord) -> bool:
+    return record.expires_at is not None and _as_utc(record.expires_at) <= datetime.now(timezone.utc)
+
+
+def _as_utc(moment: datetime) -> datetime:
+    """Aware UTC datetime; naive values (timestamp without time zone) are taken as UTC."""
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+# Authenticator backed by the application database
+api_key_authenticator = APIKeyAuthenticator(SQLAPIKeyStore(engine))
@@ -0,0 +1,215 @@
+"""
+LUXORANOVA Caching - In-process LRU/TTL cache with an optional Redis tier
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+from app.core.pubsub import follow_channel
+from app.core.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+# ============================================================================
+# In-process Tier
+# ============================================================================
+
+class TTLCache(Generic[T]):
+    """
+    Bounded LRU cache whose entries also expire after a per-entry TTL.
+    
+    Not thread safe; meant to be used from the event loop.
+    """
+    
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Tuple[float, T]]" = OrderedDict()
+    
+    def get(self, key: Hashable) -> Optional[T]:
+        """Get a live entry, or None if missing or expired."""
+        item = self._data.get(key)
+        if item is None:
+            return None
+        
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        
+        self._data.move_to_end(key)
+        return value
+    
+    def set(self, key: Hashable, value: T, ttl: float) -> None:
+        """Store value for ttl seconds, evicting the least recently used entry."""
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+    
+    def delete(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+    
+    def clear(self) -> None:
+        self._data.clear()
+    
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# ============================================================================
+# Two-tier Cache
+# ============================================================================
+
+class TwoTierCache:
+    """
+    In-process TTLCache backed by an optional shared Redis tier.
+    
+    Entries live in namespaces. ``invalidate(namespace)`` bumps the
+    namespace generation, which is part of every key, so a whole namespace
+    is dropped in O(1). With the Redis tier (or ``broadcast``) enabled,
+    generations are kept in Redis and changes are broadcast over pub/sub so
+    every process stops serving the old generation immediately.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = 1024,
+        redis_tier: bool = False,
+        broadcast: Optional[bool] = None,
+        encode: Callable[[Any], bytes] = lambda value: value,
+        decode: Callable[[bytes], Any] = lambda data: data,
+    ):
+        """
+        Args:
+            name: Cache name, used in Redis keys and the pub/sub channel
+            maxsize: Maximum number of in-process entries
+            redis_tier: Also store entries in Redis
+            broadcast: Share invalidations through Redis (defaults to redis_tier);
+                lets process-local caches of sensitive values stay coherent
+            encode: Serialiser for values written to Redis
+            decode: Deserialiser for values read from Redis
+        """
+        self.name = name
+        self.redis_tier = redis_tier
+        self.broadcast = redis_tier if broadcast is None else broadcast
+        self.encode = encode
+        self.decode = decode
+        
+        self._local: TTLCache[Any] = TTLCache(maxsize)
+        self._generations: Dict[str, int] = {}
+        self._listener: Optional[asyncio.Task] = None
+    
+    @property
+    def _channel(self) -> str:
+        return f"cache:{self.name}:invalidate"
+    
+    @property
+    def _generations_key(self) -> str:
+        return f"cache:{self.name}:generations"
+    
+    def _key(self, namespace: str, key: str) -> str:
+        return f"cache:{self.name}:{namespace}:{self._generations.get(namespace, 0)}:{key}"
+    
+    async def get(self, namespace: str, key: str) -> Optional[Any]:
+        """
+        Look up an entry, in process first and then in Redis.
+        
+        Returns:
+            Cached value or None
+        """
+        full_key = self._key(namespace, key)
+        value = self._local.get(full_key)
+        if value is not None or not self.redis_tier:
+            return value
+        
+        try:
+            pipe = redis_client._client.pipeline(transaction=False)
+            pipe.get(full_key)
+            pipe.pttl(full_key)
+            data, ttl_ms = await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Cache {self.name} Redis read failed: {str(e)}")
+            return None
+        
+        if data is None or ttl_ms <= 0:
+            return None
+        
+        value = self.decode(data)
+        self._local.set(full_key, value, ttl_ms / 1000)
+        return value
+    
+    async def set(self, namespace: str, key: str, value: Any, ttl: float) -> None:
+        """Store an entry in both tiers for ttl seconds."""
+        full_key = self._key(namespace, key)
+        self._local.set(full_key, value, ttl)
+        
+        if self.redis_tier:
+            try:
+                await redis_client._client.set(
+                    full_key, self.encode(value), px=max(1, int(ttl * 1000))
+                )
+            except Exception as e:
+                logger.warning(f"Cache {self.name} Redis write failed: {str(e)}")
+    
+    async def invalidate(self, namespace: str) -> None:
+        """Drop every entry in a namespace, in this and every other process."""
+        self._generations[namespace] = self._generations.get(namespace, 0) + 1
+        
+        if self.broadcast:
+            try:
+                generation = await redis_client._client.hincrby(
+                    self._generations_key, namespace, 1
+                )
+                self._bump(namespace, generation)
+                await redis_client._client.publish(
+                    self._channel, f"{namespace}:{generation}"
+                )
+            except Exception as e:
+                logger.warning(f"Cache {self.name} invalidation broadcast failed: {str(e)}")
+    
+    async def start(self) -> None:
+        """Load generations and follow invalidations (call from the app lifespan)."""
+        if not self.broadcast:
+            return
+        
+        if not redis_client._client:
+            await redis_client.connect()
+        
+        await self._load_generations()
+        # Generations are reloaded on every resubscription, for invalidations missed meanwhile
+        self._listener = asyncio.create_task(follow_channel(
+            self._channel,
+            self._on_invalidation,
+            self._load_generations,
+            f"Cache {self.name} invalidation",
+        ))
+    
+    async def stop(self) -> None:
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+    
+    async def _load_generations(self) -> None:
+        generations = await redis_client._client.hgetall(self._generations_key)
+        for namespace, generation in generations.items():
+            if isinstance(namespace, bytes):
+                namespace = namespace.decode()
+            self._bump(namespace, int(generation))
+    
+    def _bump(self, namespace: str, generation: int) -> None:
+        self._generations[namespace] = max(self._generations.get(namespace, 0), generation)
+    
+    def _on_invalidation(self, data: str) -> None:
+        namespace, _, generation = data.rpartition(":")
+        self._bump(namespace, int(generation))
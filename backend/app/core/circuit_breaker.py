@@ -0,0 +1,172 @@
+"""
+LUXORANOVA Circuit Breaker - Deadlines and fast failure for remote dependencies
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Optional
+
+from prometheus_client import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+# Breaker states (also the exported gauge values)
+STATE_CLOSED = 0
+STATE_HALF_OPEN = 1
+STATE_OPEN = 2
+
+STATE_NAMES = {STATE_CLOSED: "closed", STATE_HALF_OPEN: "half_open", STATE_OPEN: "open"}
+
+CIRCUIT_STATE = Gauge(
+    "circuit_breaker_state",
+    "Circuit breaker state (0 closed, 1 half open, 2 open)",
+    ["name"],
+)
+
+CIRCUIT_TRANSITIONS = Counter(
+    "circuit_breaker_transitions_total",
+    "Circuit breaker state changes",
+    ["name", "state"],
+)
+
+CIRCUIT_CALLS = Counter(
+    "circuit_breaker_calls_total",
+    "Calls through a circuit breaker by outcome",
+    ["name", "outcome"],
+)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency while its breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker with a strict per-call deadline.
+    
+    - closed: calls go through; a call that fails or exceeds ``deadline``
+      counts as a failure, and ``failure_threshold`` failures in a row open
+      the breaker.
+    - open: calls are rejected immediately with CircuitOpenError, so callers
+      fall back without waiting on the dependency. A background task runs
+      ``probe`` every ``probe_interval`` seconds.
+    - half open: after a successful probe, live calls go through again;
+      ``success_threshold`` successes close the breaker and any failure
+      reopens it.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        probe: Callable[[], Awaitable[Any]],
+        deadline: float = 0.05,
+        failure_threshold: int = 5,
+        success_threshold: int = 3,
+        probe_interval: float = 1.0,
+    ):
+        """
+        Args:
+            name: Breaker name, used as the metrics label
+            probe: Cheap health check for the dependency, e.g. a PING
+            deadline: Seconds a single call may take before it counts as failed
+            failure_threshold: Consecutive failures that open the breaker
+            success_threshold: Half-open successes that close the breaker
+            probe_interval: Seconds between background probes while open
+        """
+        self.name = name
+        self.probe = probe
+        self.deadline = deadline
+        self.failure_threshold = failure_threshold
+        self.success_threshold = success_threshold
+        self.probe_interval = probe_interval
+        
+        self.state = STATE_CLOSED
+        self._failures = 0
+        self._successes = 0
+        self._probe_task: Optional[asyncio.Task] = None
+        
+        CIRCUIT_STATE.labels(name).set(STATE_CLOSED)
+    
+    @property
+    def is_open(self) -> bool:
+        return self.state == STATE_OPEN
+    
+    async def call(self, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """
+        Await func(*args, **kwargs) within the deadline.
+        
+        Raises:
+            CircuitOpenError: The breaker is open; func was not called
+            asyncio.TimeoutError: The call exceeded the deadline
+            Exception: Whatever func raised
+        """
+        if self.state == STATE_OPEN:
+            CIRCUIT_CALLS.labels(self.name, "rejected").inc()
+            raise CircuitOpenError(f"Circuit {self.name} is open")
+        
+        try:
+            result = await asyncio.wait_for(func(*args, **kwargs), self.deadline)
+        except asyncio.TimeoutError:
+            CIRCUIT_CALLS.labels(self.name, "timeout").inc()
+            self._record_failure()
+            raise
+        except Exception:
+            CIRCUIT_CALLS.labels(self.name, "failure").inc()
+            self._record_failure()
+            raise
+        
+        CIRCUIT_CALLS.labels(self.name, "success").inc()
+        self._record_success()
+        return result
+    
+    async def stop(self) -> None:
+        """Cancel the background probe, if running."""
+        if self._probe_task:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+    
+    def _record_success(self) -> None:
+        self._failures = 0
+        if self.state == STATE_HALF_OPEN:
+            self._successes += 1
+            if self._successes >= self.success_threshold:
+                self._transition(STATE_CLOSED)
+    
+    def _record_failure(self) -> None:
+        self._failures += 1
+        if self.state == STATE_HALF_OPEN or self._failures >= self.failure_threshold:
+            self._open()
+    
+    def _open(self) -> None:
+        self._transition(STATE_OPEN)
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.create_task(self._probe_loop())
+    
+    def _transition(self, state: int) -> None:
+        if state == self.state:
+            return
+        
+        log = logger.warning if state == STATE_OPEN else logger.info
+        log(f"Circuit {self.name} {STATE_NAMES[self.state]} -> {STATE_NAMES[state]}")
+        
+        self.state = state
+        self._failures = 0
+        self._successes = 0
+        CIRCUIT_STATE.labels(self.name).set(state)
+        CIRCUIT_TRANSITIONS.labels(self.name, STATE_NAMES[state]).inc()
+    
+    async def _probe_loop(self) -> None:
+        while self.state == STATE_OPEN:
+            await asyncio.sleep(self.probe_interval)
+            try:
+                await asyncio.wait_for(self.probe(), self.deadline)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                continue
+            
+            self._transition(STATE_HALF_OPEN)
@@ -0,0 +1,161 @@
+"""
+LUXORANOVA Adaptive Concurrency - Learn the healthy in-flight limit from latency
+"""
+
+import math
+from typing import Optional
+
+from prometheus_client import Counter, Gauge
+
+CONCURRENCY_LIMIT = Gauge(
+    "adaptive_concurrency_limit",
+    "Current adaptive in-flight request limit",
+)
+
+CONCURRENCY_IN_FLIGHT = Gauge(
+    "adaptive_concurrency_in_flight",
+    "Requests currently admitted by the adaptive concurrency limiter",
+)
+
+REQUESTS_SHED = Counter(
+    "adaptive_concurrency_shed_total",
+    "Requests rejected by the adaptive concurrency limiter",
+    ["priority"],
+)
+
+# Request priorities
+PRIORITY_LOW = 0
+PRIORITY_NORMAL = 1
+PRIORITY_HIGH = 2
+PRIORITY_CRITICAL = 3
+
+PRIORITY_NAMES = {
+    PRIORITY_LOW: "low",
+    PRIORITY_NORMAL: "normal",
+    PRIORITY_HIGH: "high",
+    PRIORITY_CRITICAL: "critical",
+}
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Gradient concurrency limiter (after Netflix's Gradient2).
+    
+    Compares a smoothed recent latency with a no-load baseline (the lowest
+    latency seen, drifting up only on samples taken while lightly loaded,
+    so queueing delay never leaks into it). While latency stays within
+    ``tolerance`` of the baseline the limit grows by about sqrt(limit) per
+    sample; once queueing inflates latency the gradient
+    ``tolerance * baseline / latency`` drops below 1 and the limit shrinks
+    multiplicatively (never by more than half per sample). Errors count as
+    a strong congestion signal and back the limit off by ``backoff``.
+    
+    Each priority may use a share of the limit: low priority traffic is shed
+    first, high priority may borrow headroom above it, and critical traffic
+    is always admitted.
+    """
+    
+    # Weight of each sample in the recent latency average
+    LATENCY_ALPHA = 0.1
+    
+    # Share of the limit each priority may fill
+    PRIORITY_SHARES = {
+        PRIORITY_LOW: 0.75,
+        PRIORITY_NORMAL: 1.0,
+        PRIORITY_HIGH: 1.25,
+    }
+    
+    def __init__(
+        self,
+        initial_limit: int = 100,
+        min_limit: int = 10,
+        max_limit: int = 2000,
+        smoothing: float = 0.02,
+        tolerance: float = 1.5,
+        baseline_window: int = 600,
+        backoff: float = 0.9,
+    ):
+        """
+        Args:
+            initial_limit: Starting in-flight limit
+            min_limit: The limit never drops below this
+            max_limit: The limit never grows above this
+            smoothing: Weight of each per-request limit estimate (0-1)
+            tolerance: Latency inflation over the baseline accepted before
+                the limit starts shrinking
+            baseline_window: Lightly loaded samples averaged into the baseline
+            backoff: Multiplier applied to the limit when a request fails
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.smoothing = smoothing
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self._baseline_alpha = 2 / (baseline_window + 1)
+        
+        self.limit = float(initial_limit)
+        self.in_flight = 0
+        self.latency: Optional[float] = None
+        self.baseline: Optional[float] = None
+        
+        CONCURRENCY_LIMIT.set(initial_limit)
+    
+    def try_acquire(self, priority: int = PRIORITY_NORMAL) -> bool:
+        """
+        Admit a request if its priority still has headroom.
+        
+        Returns:
+            True if admitted; the caller must then call ``release``
+        """
+        if priority < PRIORITY_CRITICAL and self.in_flight >= self.limit * self.PRIORITY_SHARES[priority]:
+            REQUESTS_SHED.labels(PRIORITY_NAMES[priority]).inc()
+            return False
+        
+        self.in_flight += 1
+        CONCURRENCY_IN_FLIGHT.set(self.in_flight)
+        return True
+    
+    def release(self, latency: float, failed: bool = False, sample: bool = True) -> None:
+        """
+        Finish an admitted request and update the limit.
+        
+        Args:
+            latency: Seconds the request took
+            failed: The request errored (e.g. 5xx); treated as congestion
+            sample: Learn from this request (off for health probes, whose
+                latency and failures say nothing about the API's)
+        """
+        in_flight = self.in_flight
+        self.in_flight -= 1
+        CONCURRENCY_IN_FLIGHT.set(self.in_flight)
+        
+        if not sample:
+            return
+        if failed:
+            self._set_limit(self.limit * self.backoff)
+            return
+        
+        if self.latency is None:
+            self.latency = self.baseline = latency
+            return
+        
+        self.latency += self.LATENCY_ALPHA * (latency - self.latency)
+        
+        lightly_loaded = in_flight < self.limit / 2
+        if latency < self.baseline:
+            self.baseline = latency
+        elif lightly_loaded:
+            # No queueing, so the baseline may follow slower (not just faster) latency
+            self.baseline += self._baseline_alpha * (latency - self.baseline)
+        
+        if lightly_loaded:
+            # Not enough load to learn anything about the limit
+            return
+        
+        gradient = max(0.5, min(1.0, self.tolerance * self.baseline / self.latency))
+        estimate = self.limit * gradient + math.sqrt(self.limit)
+        self._set_limit(self.limit * (1 - self.smoothing) + estimate * self.smoothing)
+    
+    def _set_limit(self, limit: float) -> None:
+        self.limit = max(self.min_limit, min(self.max_limit, limit))
+        CONCURRENCY_LIMIT.set(self.limit)
@@ -0,0 +1,390 @@
+"""
+LUXORANOVA Encryption - AES-256-GCM envelope encryption with a data key cache
+"""
+
+import base64
+import os
+import struct
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Protocol, Tuple
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from prometheus_client import Counter
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+DATA_KEY_UNWRAPS = Counter(
+    "encryption_data_key_unwraps_total",
+    "Data key lookups during decryption by outcome (cached or unwrapped)",
+    ["outcome"],
+)
+_UNWRAPS_CACHED = DATA_KEY_UNWRAPS.labels("cached")
+_UNWRAPS_UNWRAPPED = DATA_KEY_UNWRAPS.labels("unwrapped")
+
+NONCE_SIZE = 12
+KEY_SIZE = 32
+
+# Envelope formats (first byte of every ciphertext)
+FORMAT_MESSAGE = 1
+FORMAT_STREAM = 2
+
+# Plaintext bytes per segment in streaming mode
+STREAM_SEGMENT_SIZE = 64 * 1024
+
+
+class DecryptionError(Exception):
+    """Raised when a ciphertext is malformed, truncated or fails authentication."""
+
+
+# ============================================================================
+# Key Providers
+# ============================================================================
+
+class KeyProvider(Protocol):
+    """
+    Wraps and unwraps data keys with a master key (a KMS, or a local stand-in).
+    
+    Wrapped keys must be self-describing: ``unwrap`` gets nothing else.
+    """
+    
+    def wrap(self, data_key: bytes) -> bytes:
+        """Encrypt a data key under the master key."""
+        ...
+    
+    def unwrap(self, wrapped_key: bytes) -> bytes:
+        """Recover a data key wrapped by this provider."""
+        ...
+
+
+class LocalKeyProvider:
+    """
+    KeyProvider holding the master key in process memory.
+    
+    Stand-in for a KMS: wrapped keys carry the master key ID, so data
+    encrypted under an old master key stays readable after rotation as long
+    as that key is passed in ``previous``.
+    """
+    
+    def __init__(self, master_key: bytes, key_id: str = "local", previous: Tuple["LocalKeyProvider", ...] = ()):
+        """
+        Args:
+            master_key: 32-byte key encryption key
+            key_id: Short identifier stored with every wrapped key
+            previous: Providers for retired master keys (unwrap only)
+        """
+        if len(master_key) != KEY_SIZE:
+            raise ValueError("Master key must be 32 bytes")
+        
+        self.key_id = key_id.encode()
+        if not 0 < len(self.key_id) < 256:
+            raise ValueError("Key ID must be 1-255 bytes")
+        
+        self._aead = AESGCM(master_key)
+        self._by_id = {self.key_id: self._aead}
+        for provider in previous:
+            self._by_id.setdefault(provider.key_id, provider._aead)
+    
+    @classmethod
+    def from_secret(cls, secret: str, key_id: str = "local") -> "LocalKeyProvider":
+        """Derive the master key from a passphrase-style secret with HKDF-SHA256."""
+        master_key = HKDF(
+            algorithm=hashes.SHA256(),
+            length=KEY_SIZE,
+            salt=None,
+            info=b"luxoranova:master-key:v1",
+        ).derive(secret.encode())
+        return cls(master_key, key_id)
+    
+    @classmethod
+    def from_file(cls, path: str) -> "LocalKeyProvider":
+        """Load a master key file; the key ID is the file name without suffix."""
+        raw = Path(path).read_bytes()
+        master_key = raw if len(raw) == KEY_SIZE else base64.b64decode(raw.strip())
+        return cls(master_key, Path(path).stem)
+    
+    def wrap(self, data_key: bytes) -> bytes:
+        nonce = os.urandom(NONCE_SIZE)
+        header = bytes([len(self.key_id)]) + self.key_id
+        return header + nonce + self._aead.encrypt(nonce, data_key, header)
+    
+    def unwrap(self, wrapped_key: bytes) -> bytes:
+        id_length = wrapped_key[0]
+        header = wrapped_key[:1 + id_length]
+        aead = self._by_id.get(header[1:])
+        if aead is None:
+            raise DecryptionError(f"Unknown master key {header[1:].decode(errors='replace')!r}")
+        
+        body = wrapped_key[1 + id_length:]
+        try:
+            return aead.decrypt(body[:NONCE_SIZE], body[NONCE_SIZE:], header)
+        except InvalidTag:
+            raise DecryptionError("Data key failed authentication") from None
+
+
+# ============================================================================
+# Envelope Encryption
+# ============================================================================
+
+class EnvelopeEncryptor:
+    """
+    AES-256-GCM envelope encryption.
+    
+    Each ciphertext carries its data key wrapped by the KeyProvider. The
+    encryptor reuses one data key for up to ``data_key_max_messages``
+    messages or ``data_key_max_age`` seconds, so encrypting costs one wrap
+    per data key rather than per call; decryption keeps unwrapped data keys
+    in a bounded TTL cache, so only the first message under each data key
+    pays for an unwrap (a KMS round trip, in production).
+    
+    Message layout: format (1) | wrapped key length (2) | wrapped key |
+    nonce (12) | ciphertext + tag. The header is authenticated as
+    associated data together with any caller-supplied context.
+    
+    Thread safe.
+    """
+    
+    def __init__(
+        self,
+        provider: KeyProvider,
+        cache_size: int = 1024,
+        cache_ttl: float = 3600.0,
+        data_key_max_age: float = 300.0,
+        data_key_max_messages: int = 1 << 20,
+    ):
+        """
+        Args:
+            provider: Wraps and unwraps data keys
+            cache_size: Maximum number of unwrapped data keys kept
+            cache_ttl: Seconds an unwrapped data key is kept
+            data_key_max_age: Seconds before encryption moves to a new data key
+            data_key_max_messages: Messages before encryption moves to a new
+                data key (well below the 2**32 random-nonce limit)
+        """
+        self.provider = provider
+        self.cache_ttl = cache_ttl
+        self.data_key_max_age = data_key_max_age
+        self.data_key_max_messages = data_key_max_messages
+        
+        self._lock = threading.Lock()
+        self._data_keys: TTLCache[AESGCM] = TTLCache(maxsize=cache_size)
+        self._current: Optional[Tuple[bytes, AESGCM]] = None
+        self._current_expires = 0.0
+        self._current_uses = 0
+    
+    def encrypt(self, plaintext: bytes, context: bytes = b"") -> bytes:
+        """
+        Encrypt a message.
+        
+        Args:
+            plaintext: Data to encrypt
+            context: Associated data (e.g. a record ID) that must be presented
+                again to decrypt; binds the ciphertext to where it is stored
+        
+        Returns:
+            Ciphertext
+        """
+        wrapped_key, aead = self._data_key()
+        header = struct.pack(">BH", FORMAT_MESSAGE, len(wrapped_key)) + wrapped_key
+        nonce = os.urandom(NONCE_SIZE)
+        return header + nonce + aead.encrypt(nonce, plaintext, header + context)
+    
+    def decrypt(self, ciphertext: bytes, context: bytes = b"") -> bytes:
+        """
+        Decrypt a message produced by encrypt.
+        
+        Raises:
+            DecryptionError: The ciphertext is malformed, was tampered with or
+                the context does not match
+        """
+        header, aead, body = self._open(ciphertext, FORMAT_MESSAGE)
+        try:
+            return aead.decrypt(body[:NONCE_SIZE], body[NONCE_SIZE:], header + context)
+        except InvalidTag:
+            raise DecryptionError("Ciphertext failed authentication") from None
+    
+    def encrypt_stream(
+        self,
+        chunks: Iterable[bytes],
+        context: bytes = b"",
+        segment_size: int = STREAM_SEGMENT_SIZE,
+    ) -> Iterator[bytes]:
+        """
+        Encrypt a byte stream in fixed-size authenticated segments.
+        
+        Memory use is bounded by one segment whatever the input size. Each
+        segment's nonce is a random prefix, its index and a final-segment
+        flag (the STREAM construction), so segments cannot be reordered,
+        dropped or truncated without detection.
+        
+        Layout: header as in encrypt, with a 7-byte nonce prefix instead of
+        the nonce, then per segment its ciphertext length (4) and ciphertext.
+        
+        Args:
+            chunks: Plaintext pieces of any size
+            context: Associated data, as in encrypt
+            segment_size: Plaintext bytes per segment
+        
+        Yields:
+            Ciphertext pieces (the header, then one per segment)
+        """
+        wrapped_key, aead = self._data_key()
+        prefix = os.urandom(7)
+        header = struct.pack(">BH", FORMAT_STREAM, len(wrapped_key)) + wrapped_key + prefix
+        associated_data = header + context
+        yield header
+        
+        index = 0
+        pending = b""
+        buffer = bytearray()
+        for chunk in chunks:
+            buffer += chunk
+            while len(buffer) > segment_size:
+                # Hold back the last segment until we know it is the last
+                if pending:
+                    yield _seal_segment(aead, prefix, index, pending, False, associated_data)
+                    index += 1
+                pending = bytes(buffer[:segment_size])
+                del buffer[:segment_size]
+        
+        if buffer:
+            if pending:
+                yield _seal_segment(aead, prefix, index, pending, False, associated_data)
+                index += 1
+            pending = bytes(buffer)
+        yield _seal_segment(aead, prefix, index, pending, True, associated_data)
+    
+    def decrypt_stream(self, chunks: Iterable[bytes], context: bytes = b"") -> Iterator[bytes]:
+        """
+        Decrypt a stream produced by encrypt_stream.
+        
+        Plaintext is released one authenticated segment at a time, so a
+        consumer must discard what it has received if an error is raised.
+        
+        Raises:
+            DecryptionError: The stream is malformed, truncated, reordered or
+                was tampered with
+        """
+        buffer = bytearray()
+        chunks = iter(chunks)
+        
+        def fill(size: int) -> bool:
+            while len(buffer) < size:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    return False
+                buffer.extend(chunk)
+            return True
+        
+        if not fill(3):
+            raise DecryptionError("Truncated stream header")
+        header_length = 3 + struct.unpack(">H", buffer[1:3])[0] + 7
+        if not fill(header_length):
+            raise DecryptionError("Truncated stream header")
+        
+        header, aead, _ = self._open(bytes(buffer[:header_length]), FORMAT_STREAM)
+        prefix = header[-7:]
+        associated_data = header + context
+        del buffer[:header_length]
+        
+        index = 0
+        while True:
+            if not fill(4):
+                raise DecryptionError("Stream ended before its final segment")
+            length = struct.unpack(">I", buffer[:4])[0]
+            if not fill(4 + length):
+                raise DecryptionError("Truncated stream segment")
+            sealed = bytes(buffer[4:4 + length])
+            del buffer[:4 + length]
+            
+            try:
+                yield aead.decrypt(_segment_nonce(prefix, index, False), sealed, associated_data)
+            except InvalidTag:
+                try:
+                    plaintext = aead.decrypt(_segment_nonce(prefix, index, True), sealed, associated_data)
+                except InvalidTag:
+                    raise DecryptionError(f"Stream segment {index} failed authentication") from None
+                
+                if buffer or fill(1):
+                    raise DecryptionError("Data after the final stream segment")
+                yield plaintext
+                return
+            index += 1
+    
+    def _data_key(self) -> Tuple[bytes, AESGCM]:
+        with self._lock:
+            if (
+                self._current is None
+                or self._current_uses >= self.data_key_max_messages
+                or self._current_expires <= time.monotonic()
+            ):
+                data_key = AESGCM.generate_key(bit_length=256)
+                wrapped_key = self.provider.wrap(data_key)
+                aead = AESGCM(data_key)
+                self._current = (wrapped_key, aead)
+                self._current_expires = time.monotonic() + self.data_key_max_age
+                self._current_uses = 0
+                # Our own messages decrypt without an unwrap
+                self._data_keys.set(wrapped_key, aead, self.cache_ttl)
+            
+            self._current_uses += 1
+            return self._current
+    
+    def _open(self, ciphertext: bytes, expected_format: int) -> Tuple[bytes, AESGCM, memoryview]:
+        if len(ciphertext) < 3 or ciphertext[0] != expected_format:
+            raise DecryptionError("Not an envelope of the expected format")
+        
+        end = 3 + struct.unpack(">H", ciphertext[1:3])[0]
+        wrapped_key = ciphertext[3:end]
+        if expected_format == FORMAT_STREAM:
+            end += 7
+        if len(ciphertext) < end:
+            raise DecryptionError("Truncated envelope header")
+        
+        with self._lock:
+            aead = self._data_keys.get(wrapped_key)
+        
+        if aead is None:
+            _UNWRAPS_UNWRAPPED.inc()
+            try:
+                aead = AESGCM(self.provider.unwrap(wrapped_key))
+            except (IndexError, ValueError):
+                raise DecryptionError("Malformed wrapped data key") from None
+            with self._lock:
+                self._data_keys.set(wrapped_key, aead, self.cache_ttl)
+        else:
+            _UNWRAPS_CACHED.inc()
+        
+        # memoryview: no copy of the (possibly large) body
+        return ciphertext[:end], aead, memoryview(ciphertext)[end:]
+
+
+def _segment_nonce(prefix: bytes, index: int, final: bool) -> bytes:
+    return prefix + struct.pack(">IB", index, final)
+
+
+def _seal_segment(
+    aead: AESGCM, prefix: bytes, index: int, plaintext: bytes, final: bool, associated_data: bytes
+) -> bytes:
+    sealed = aead.encrypt(_segment_nonce(prefix, index, final), plaintext, associated_data)
+    return struct.pack(">I", len(sealed)) + sealed
+
+
+@lru_cache
+def get_encryptor() -> EnvelopeEncryptor:
+    """
+    Shared encryptor for application data.
+    
+    The master key comes from ENCRYPTION_KEY_FILE if set, otherwise it is
+    derived from ENCRYPTION_KEY.
+    """
+    key_file = getattr(settings, "ENCRYPTION_KEY_FILE", None)
+    if key_file:
+        return EnvelopeEncryptor(LocalKeyProvider.from_file(key_file))
+    return EnvelopeEncryptor(LocalKeyProvider.from_secret(settings.ENCRYPTION_KEY))
@@ -0,0 +1,147 @@
+"""
+LUXORANOVA HTTP Client - Shared, lifespan-owned aiohttp sessions for outbound calls
+"""
+
+from types import SimpleNamespace
+from typing import Dict, Optional
+
+import aiohttp
+from prometheus_client import Counter, Gauge
+
+HTTP_POOL_CONNECTIONS = Gauge(
+    "http_client_pool_connections",
+    "Outbound connections by pool and state (in_use, idle)",
+    ["pool", "state"],
+)
+
+HTTP_POOL_LIMIT = Gauge(
+    "http_client_pool_limit",
+    "Maximum outbound connections per pool",
+    ["pool"],
+)
+
+HTTP_POOL_EVENTS = Counter(
+    "http_client_pool_events_total",
+    "Outbound connection pool events (created, reused, queued, dns_hit, dns_miss)",
+    ["pool", "event"],
+)
+
+
+class SharedHTTPSession:
+    """
+    One aiohttp session (and connection pool) shared by every caller of an
+    upstream service for the life of the app.
+    
+    Connections are kept alive between requests and DNS answers are cached,
+    so steady-state requests skip TCP, TLS and DNS setup. Connect and read
+    timeouts are separate: a dead host fails fast while a slow response may
+    still stream. Pool use is exported as Prometheus metrics.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        limit: int = 100,
+        limit_per_host: int = 20,
+        keepalive_timeout: float = 30.0,
+        dns_cache_ttl: int = 300,
+        connect_timeout: float = 3.0,
+        read_timeout: float = 15.0,
+        total_timeout: Optional[float] = 30.0,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Args:
+            name: Pool name, used as the metrics label
+            limit: Maximum connections overall
+            limit_per_host: Maximum connections to any one host
+            keepalive_timeout: Seconds an idle connection is kept open
+            dns_cache_ttl: Seconds DNS answers are reused
+            connect_timeout: Seconds to establish a connection
+            read_timeout: Seconds to wait for each read from the socket
+            total_timeout: Overall cap per request, including pool waits
+            headers: Default headers for every request
+        """
+        self.name = name
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.timeout = aiohttp.ClientTimeout(
+            total=total_timeout,
+            sock_connect=connect_timeout,
+            sock_read=read_timeout,
+        )
+        self.headers = headers or {}
+        
+        self._session: Optional[aiohttp.ClientSession] = None
+        
+        HTTP_POOL_LIMIT.labels(name).set(limit)
+        HTTP_POOL_CONNECTIONS.labels(name, "in_use").set_function(self._in_use)
+        HTTP_POOL_CONNECTIONS.labels(name, "idle").set_function(self._idle)
+    
+    async def start(self) -> None:
+        """Open the pool (call from the app lifespan)."""
+        self._open()
+    
+    async def stop(self) -> None:
+        """Close the pool and its connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """The shared session; opened on first use outside the app (scripts)."""
+        if self._session is None or self._session.closed:
+            self._open()
+        return self._session
+    
+    def _open(self) -> None:
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=self.timeout,
+            headers=self.headers,
+            trace_configs=[self._trace_config()],
+        )
+    
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace_config = aiohttp.TraceConfig()
+        for signal, event in (
+            (trace_config.on_connection_create_end, "created"),
+            (trace_config.on_connection_reuseconn, "reused"),
+            (trace_config.on_connection_queued_start, "queued"),
+            (trace_config.on_dns_cache_hit, "dns_hit"),
+            (trace_config.on_dns_cache_miss, "dns_miss"),
+        ):
+            signal.append(self._counter(HTTP_POOL_EVENTS.labels(self.name, event)))
+        return trace_config
+    
+    @staticmethod
+    def _counter(counter):
+        async def count(session: aiohttp.ClientSession, context: SimpleNamespace, params) -> None:
+            counter.inc()
+        return count
+    
+    def _connector(self) -> Optional[aiohttp.TCPConnector]:
+        if self._session is None or self._session.closed:
+            return None
+        return self._session.connector
+    
+    def _in_use(self) -> int:
+        connector = self._connector()
+        # aiohttp exposes no public pool statistics
+        return len(getattr(connector, "_acquired", ())) if connector else 0
+    
+    def _idle(self) -> int:
+        connector = self._connector()
+        if connector is None:
+            return 0
+        return sum(len(conns) for conns in getattr(connector, "_conns", {}).values())
@@ -0,0 +1,305 @@
+"""
+LUXORANOVA JWT Keys - ES256 signing keys, JWKS publication and rotation
+"""
+
+import asyncio
+import calendar
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import aiohttp
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Algorithms signed with a key pair from the key ring rather than JWT_SECRET_KEY
+ASYMMETRIC_ALGORITHMS = frozenset({"ES256"})
+
+# How long verifiers may cache the JWKS document
+JWKS_MAX_AGE = 300
+
+# kids are the key's UTC creation time, which orders keys for rotation
+KID_FORMAT = "%Y%m%d%H%M%S"
+
+
+class JWTKey(NamedTuple):
+    """A signing key pair and its public JWK."""
+    kid: str
+    private_key: Key
+    public_key: Key
+    public_jwk: Dict[str, Any]
+    created_at: float
+
+
+def _kid_created_at(kid: str) -> float:
+    """Creation time recorded in a kid by generate_key (file mtimes do not survive copies)."""
+    try:
+        return float(calendar.timegm(time.strptime(kid, KID_FORMAT)))
+    except ValueError:
+        raise ValueError(f"kid {kid!r} is not a {KID_FORMAT} UTC timestamp") from None
+
+
+def _load_key(path: Path, algorithm: str) -> JWTKey:
+    created_at = _kid_created_at(path.stem)
+    private = serialization.load_pem_private_key(path.read_bytes(), password=None)
+    if not isinstance(private, ec.EllipticCurvePrivateKey) or private.curve.name != "secp256r1":
+        raise ValueError(f"{path.name} is not a P-256 private key")
+    
+    public_pem = private.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+    private_pem = private.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    
+    public_key = jwk.construct(public_pem, algorithm)
+    public_jwk = {**public_key.to_dict(), "kid": path.stem, "use": "sig", "alg": algorithm}
+    return JWTKey(
+        path.stem,
+        jwk.construct(private_pem, algorithm),
+        public_key,
+        public_jwk,
+        created_at,
+    )
+
+
+def generate_key(directory: str) -> str:
+    """
+    Create a new P-256 signing key in directory.
+    
+    The key is published in the JWKS immediately and starts signing once
+    verifiers have had time to fetch it (see JWTKeyRing).
+    
+    Args:
+        directory: Key ring directory
+    
+    Returns:
+        kid of the new key
+    """
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+    
+    kid = time.strftime(KID_FORMAT, time.gmtime())
+    pem = ec.generate_private_key(ec.SECP256R1()).private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    
+    key_file = path / f"{kid}.pem"
+    fd = os.open(key_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(pem)
+    
+    return kid
+
+
+# ============================================================================
+# Key Ring (issuer side)
+# ============================================================================
+
+class JWTKeyRing:
+    """
+    Signing keys loaded from a directory of ``<kid>.pem`` files, where the
+    kid is the key's creation time as written by generate_key.
+    
+    Every key in the directory is published in the JWKS and accepted for
+    verification. The signing key is the newest one that has been published
+    for at least ``publish_delay`` seconds (longer than verifiers cache the
+    JWKS), so rotation needs no coordination:
+    
+    1. ``python -m app.core.jwt_keys generate <dir>`` adds a key; it is
+       published straight away and signs once every verifier has seen it.
+    2. Once the refresh token lifetime has passed, delete the old key file.
+    
+    The directory is rescanned every ``reload_interval`` seconds and when a
+    token names an unknown kid.
+    """
+    
+    def __init__(
+        self,
+        directory: str,
+        algorithm: str = "ES256",
+        publish_delay: float = 2 * JWKS_MAX_AGE,
+        reload_interval: float = 60.0,
+    ):
+        self.directory = Path(directory)
+        self.algorithm = algorithm
+        self.publish_delay = publish_delay
+        self.reload_interval = reload_interval
+        
+        self.keys: Dict[str, JWTKey] = {}
+        self.active: Optional[JWTKey] = None
+        self.jwks_json = b'{"keys": []}'
+        self.jwks_etag = '"empty"'
+        
+        self._loaded_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+    
+    async def start(self) -> None:
+        """Load keys and watch the directory (call from the app lifespan)."""
+        self.load()
+        if self.active is None:
+            raise RuntimeError(f"No JWT signing keys in {self.directory}")
+        self._task = asyncio.create_task(self._reload_loop())
+    
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    def load(self) -> None:
+        """Rescan the key directory."""
+        self._loaded_at = time.monotonic()
+        
+        keys: Dict[str, JWTKey] = {}
+        for path in sorted(self.directory.glob("*.pem")):
+            try:
+                keys[path.stem] = _load_key(path, self.algorithm)
+            except Exception as e:
+                logger.error(f"Skipping JWT key {path.name}: {str(e)}")
+        
+        newest_first = sorted(keys.values(), key=lambda key: key.created_at, reverse=True)
+        publishable_before = time.time() - self.publish_delay
+        active = next(
+            (key for key in newest_first if key.created_at <= publishable_before),
+            newest_first[0] if newest_first else None,
+        )
+        
+        jwks = json.dumps(
+            {"keys": [key.public_jwk for key in newest_first]}, separators=(",", ":")
+        ).encode()
+        
+        if active and (self.active is None or active.kid != self.active.kid):
+            logger.info(f"JWT signing key is now {active.kid}")
+        
+        self.keys, self.active = keys, active
+        self.jwks_json = jwks
+        self.jwks_etag = f'"{hashlib.blake2b(jwks, digest_size=8).hexdigest()}"'
+    
+    def sign(self, claims: Dict[str, Any]) -> str:
+        """Sign claims with the active key, naming it in the ``kid`` header."""
+        if self.active is None:
+            self.load()
+            if self.active is None:
+                raise RuntimeError(f"No JWT signing keys in {self.directory}")
+        
+        return jwt.encode(
+            claims,
+            self.active.private_key,
+            algorithm=self.algorithm,
+            headers={"kid": self.active.kid},
+        )
+    
+    def verify(self, token: str) -> Dict[str, Any]:
+        """
+        Verify a token against the key named by its ``kid`` header.
+        
+        Raises:
+            JWTError: The token is invalid, expired or signed by an unknown key
+        """
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = self.keys.get(kid)
+        if key is None and time.monotonic() - self._loaded_at > 5:
+            # Possibly added on another replica since our last scan
+            self.load()
+            key = self.keys.get(kid)
+        if key is None:
+            raise JWTError(f"Unknown signing key {kid!r}")
+        
+        return jwt.decode(token, key.public_key, algorithms=[self.algorithm])
+    
+    async def _reload_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                await asyncio.to_thread(self.load)
+            except Exception as e:
+                logger.warning(f"JWT key reload failed: {str(e)}")
+
+
+# ============================================================================
+# JWKS Verifier (for sibling services)
+# ============================================================================
+
+class JWKSVerifier:
+    """
+    Verify tokens locally with keys fetched from the backend's JWKS endpoint.
+    
+    Keys are refreshed every ``JWKS_MAX_AGE`` seconds and whenever a token
+    names an unknown kid (at most once per ``min_refresh_interval``), so
+    rotations are picked up without any per-request call to the backend.
+    """
+    
+    def __init__(self, jwks_url: str, min_refresh_interval: float = 10.0):
+        self.jwks_url = jwks_url
+        self.min_refresh_interval = min_refresh_interval
+        
+        self.keys: Dict[str, Key] = {}
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+    
+    async def refresh(self) -> None:
+        """Fetch the JWKS document."""
+        async with self._lock:
+            if time.monotonic() - self._fetched_at < self.min_refresh_interval:
+                return
+            
+            timeout = aiohttp.ClientTimeout(total=5)
+            async with aiohttp.ClientSession(timeout=timeout) as session:
+                async with session.get(self.jwks_url) as response:
+                    response.raise_for_status()
+                    document = await response.json()
+            
+            keys: List[Dict[str, Any]] = document.get("keys", [])
+            self.keys = {key["kid"]: jwk.construct(key, key["alg"]) for key in keys}
+            self._fetched_at = time.monotonic()
+    
+    async def verify(self, token: str) -> Dict[str, Any]:
+        """
+        Verify a token and return its claims.
+        
+        Raises:
+            JWTError: The token is invalid, expired or signed by an unknown key
+        """
+        header = jwt.get_unverified_header(token)
+        kid, algorithm = header.get("kid"), header.get("alg")
+        if algorithm not in ASYMMETRIC_ALGORITHMS:
+            raise JWTError(f"Unexpected algorithm {algorithm!r}")
+        
+        if kid not in self.keys or time.monotonic() - self._fetched_at > JWKS_MAX_AGE:
+            await self.refresh()
+        key = self.keys.get(kid)
+        if key is None:
+            raise JWTError(f"Unknown signing key {kid!r}")
+        
+        return jwt.decode(token, key, algorithms=[algorithm])
+
+
+# Issuer key ring; keys live in JWT_KEYS_DIR (default "keys/jwt")
+jwt_keyring = JWTKeyRing(getattr(settings, "JWT_KEYS_DIR", "keys/jwt"))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "generate":
+        sys.exit("Usage: python -m app.core.jwt_keys generate [directory]")
+    
+    print(generate_key(sys.argv[2] if len(sys.argv) > 2 else str(jwt_keyring.directory)))
@@ -0,0 +1,96 @@
+"""
+LUXORANOVA Load Monitor - Event loop lag and process CPU sampling
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from prometheus_client import Gauge
+
+logger = logging.getLogger(__name__)
+
+EVENT_LOOP_LAG = Gauge(
+    "event_loop_lag_seconds",
+    "How late the event loop woke up for the last load monitor tick",
+)
+
+PROCESS_CPU_UTILISATION = Gauge(
+    "process_cpu_utilisation_ratio",
+    "Process CPU time per wall-clock second over the last sampling interval",
+)
+
+# Pressure levels
+PRESSURE_NORMAL = 0
+PRESSURE_ELEVATED = 1
+PRESSURE_HIGH = 2
+
+
+class LoadMonitor:
+    """
+    Samples event loop lag and process CPU utilisation in the background.
+    
+    Consumers read ``pressure`` (a plain attribute, free to read on the hot
+    path) to shed optional work, such as expensive compression levels,
+    while the process is saturated.
+    """
+    
+    def __init__(
+        self,
+        interval: float = 0.5,
+        elevated_lag: float = 0.010,
+        high_lag: float = 0.050,
+        elevated_cpu: float = 0.60,
+        high_cpu: float = 0.85,
+    ):
+        self.interval = interval
+        self.elevated_lag = elevated_lag
+        self.high_lag = high_lag
+        self.elevated_cpu = elevated_cpu
+        self.high_cpu = high_cpu
+        
+        self.lag = 0.0
+        self.cpu = 0.0
+        self.pressure = PRESSURE_NORMAL
+        self._task: Optional[asyncio.Task] = None
+    
+    async def start(self) -> None:
+        """Start sampling (call from the app lifespan)."""
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        """Stop sampling."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _run(self) -> None:
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        
+        while True:
+            await asyncio.sleep(self.interval)
+            
+            now_wall = time.perf_counter()
+            now_cpu = time.process_time()
+            elapsed = now_wall - wall
+            
+            self.lag = max(0.0, elapsed - self.interval)
+            self.cpu = (now_cpu - cpu) / elapsed if elapsed > 0 else 0.0
+            self.pressure = self._classify()
+            wall, cpu = now_wall, now_cpu
+            
+            EVENT_LOOP_LAG.set(self.lag)
+            PROCESS_CPU_UTILISATION.set(self.cpu)
+    
+    def _classify(self) -> int:
+        if self.lag >= self.high_lag or self.cpu >= self.high_cpu:
+            return PRESSURE_HIGH
+        if self.lag >= self.elevated_lag or self.cpu >= self.elevated_cpu:
+            return PRESSURE_ELEVATED
+        return PRESSURE_NORMAL
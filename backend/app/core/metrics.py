@@ -0,0 +1,141 @@
+"""
+LUXORANOVA Metrics - Prometheus instruments and per-request phase timing
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Dict, Iterator, Optional
+
+from prometheus_client import Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+# ============================================================================
+# HTTP Metrics
+# ============================================================================
+
+# Buckets tuned for an API whose p50 sits in the low milliseconds
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template, method and status",
+    ["route", "method", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served",
+    ["method"],
+)
+
+# Route label for requests that never matched a route (404s, throttled)
+UNMATCHED_ROUTE = "unmatched"
+
+
+def route_template(scope: dict) -> str:
+    """
+    Get the route template (e.g. "/api/v1/agents/{agent_id}") for a request.
+    
+    Only valid once routing has run; using templates instead of raw paths
+    keeps label cardinality bounded.
+    """
+    route = scope.get("route")
+    if route is None:
+        return UNMATCHED_ROUTE
+    
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+# ============================================================================
+# Request Phase Timing (Server-Timing)
+# ============================================================================
+
+_phase_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar(
+    "phase_timings", default=None
+)
+
+
+def start_phase_timings() -> Token:
+    """Begin collecting phase durations for the current request."""
+    return _phase_timings.set({})
+
+
+def finish_phase_timings(token: Token) -> Dict[str, float]:
+    """Stop collecting and return the phase durations in seconds."""
+    phases = _phase_timings.get() or {}
+    _phase_timings.reset(token)
+    return phases
+
+
+def current_phase_timings() -> Dict[str, float]:
+    """Phase durations recorded so far for the current request."""
+    return _phase_timings.get() or {}
+
+
+def record_phase(name: str, seconds: float) -> None:
+    """
+    Add time spent in a phase to the current request, if one is being timed.
+    
+    Args:
+        name: Phase name ("db", "redis", ...)
+        seconds: Duration to add
+    """
+    phases = _phase_timings.get()
+    if phases is not None:
+        phases[name] = phases.get(name, 0.0) + seconds
+
+
+@contextmanager
+def timed_phase(name: str) -> Iterator[None]:
+    """Time the enclosed block as phase ``name`` of the current request."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(name, time.perf_counter() - start)
+
+
+def format_server_timing(phases: Dict[str, float]) -> bytes:
+    """
+    Render phase durations as a Server-Timing header value.
+    
+    Args:
+        phases: Phase durations in seconds
+    
+    Returns:
+        Header value, e.g. b"ratelimit;dur=0.41, db;dur=3.20"
+    """
+    return ", ".join(
+        f"{name};dur={seconds * 1000:.2f}" for name, seconds in phases.items()
+    ).encode("latin-1")
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """
+    Record time spent executing SQL as the "db" phase.
+    
+    SQLAlchemy runs the sync event hooks inside the caller's context, so the
+    durations land on the request that issued the query.
+    """
+    sync_engine = engine.sync_engine
+    
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+    
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        record_phase("db", time.perf_counter() - conn.info["query_start"].pop())
+    
+    @event.listens_for(sync_engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
@@ -0,0 +1,201 @@
+"""
+LUXORANOVA Password Hashing - bcrypt on a bounded process pool
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Awaitable, Callable, Optional, Set
+
+from prometheus_client import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+PASSWORD_HASH_QUEUE_DEPTH = Gauge(
+    "password_hash_queue_depth",
+    "Password hash operations submitted to the pool and not yet finished",
+)
+
+PASSWORD_HASH_DURATION = Histogram(
+    "password_hash_duration_seconds",
+    "Password hash operation time including queueing, by operation",
+    ["operation"],
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0, 10.0),
+)
+
+PASSWORD_HASH_REJECTED = Counter(
+    "password_hash_rejected_total",
+    "Password hash operations refused by admission control, by operation",
+    ["operation"],
+)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing pool is saturated; respond with 503 + Retry-After."""
+
+
+# ============================================================================
+# Worker Functions (run in the pool processes)
+# ============================================================================
+
+def _hash(password: str) -> str:
+    from app.core.security import pwd_context
+    return pwd_context.hash(password)
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    from app.core.security import pwd_context
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def _warm_up() -> None:
+    from app.core.security import pwd_context  # noqa: F401 - import once per worker
+
+
+# ============================================================================
+# Hasher
+# ============================================================================
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated process pool so hashing never blocks the
+    event loop or holds the GIL.
+    
+    At most ``max_pending`` operations may be queued or running; beyond that
+    callers get PasswordHasherBusy immediately instead of waiting, so a
+    login storm is turned away at the door rather than queueing for
+    seconds. Background rehashes only run while the pool has idle workers.
+    """
+    
+    def __init__(self, workers: Optional[int] = None, max_pending: Optional[int] = None):
+        """
+        Args:
+            workers: Pool size (defaults to half the CPUs, at least 1)
+            max_pending: Admission limit (defaults to 4 per worker)
+        """
+        self.workers = workers or max(1, (os.cpu_count() or 2) // 2)
+        self.max_pending = max_pending or self.workers * 4
+        
+        self.pending = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._background: Set[asyncio.Task] = set()
+    
+    async def start(self) -> None:
+        """Start the worker processes (call from the app lifespan)."""
+        executor = self._get_executor()
+        # Spawn workers and import bcrypt now rather than on the first login
+        await asyncio.gather(*(
+            asyncio.get_running_loop().run_in_executor(executor, _warm_up)
+            for _ in range(self.workers)
+        ))
+    
+    async def stop(self) -> None:
+        """Finish background rehashes and shut the pool down."""
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+        
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+    
+    async def hash(self, password: str) -> str:
+        """
+        Hash a password.
+        
+        Raises:
+            PasswordHasherBusy: The pool is saturated
+        """
+        return await self._submit("hash", _hash, password)
+    
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """
+        Verify a password against a hash.
+        
+        Raises:
+            PasswordHasherBusy: The pool is saturated
+        """
+        return await self._submit("verify", _verify, plain_password, hashed_password)
+    
+    async def verify_and_update(
+        self,
+        plain_password: str,
+        hashed_password: str,
+        save_hash: Callable[[str], Awaitable[None]],
+    ) -> bool:
+        """
+        Verify a password and, if its hash uses deprecated settings, rehash it
+        in the background.
+        
+        The caller gets its answer after a single verification; the new hash
+        is computed afterwards, only while the pool has idle capacity, and
+        handed to ``save_hash`` for storage.
+        
+        Args:
+            plain_password: Password presented by the user
+            hashed_password: Stored hash
+            save_hash: Coroutine function persisting the new hash
+        
+        Returns:
+            True if the password matches
+        
+        Raises:
+            PasswordHasherBusy: The pool is saturated
+        """
+        from app.core.security import pwd_context
+        
+        valid = await self.verify(plain_password, hashed_password)
+        if valid and pwd_context.needs_update(hashed_password):
+            task = asyncio.create_task(self._rehash(plain_password, save_hash))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+        
+        return valid
+    
+    async def _rehash(self, plain_password: str, save_hash: Callable[[str], Awaitable[None]]) -> None:
+        if self.pending >= self.workers:
+            # Not urgent: try again on a later login
+            PASSWORD_HASH_REJECTED.labels("rehash").inc()
+            return
+        
+        try:
+            await save_hash(await self._submit("rehash", _hash, plain_password))
+        except Exception as e:
+            logger.warning(f"Background password rehash failed: {str(e)}")
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: never fork a process that is running an event loop and threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+    
+    async def _submit(self, operation: str, func: Callable[..., Any], *args: Any) -> Any:
+        if self.pending >= self.max_pending:
+            PASSWORD_HASH_REJECTED.labels(operation).inc()
+            raise PasswordHasherBusy("Password hashing is at capacity")
+        
+        self.pending += 1
+        PASSWORD_HASH_QUEUE_DEPTH.set(self.pending)
+        start_time = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._get_executor(), func, *args
+            )
+        except BrokenProcessPool:
+            logger.error("Password hashing pool broke; restarting it")
+            self._executor = None
+            raise
+        finally:
+            self.pending -= 1
+            PASSWORD_HASH_QUEUE_DEPTH.set(self.pending)
+            PASSWORD_HASH_DURATION.labels(operation).observe(time.perf_counter() - start_time)
+
+
+# Shared hasher
+password_hasher = PasswordHasher()
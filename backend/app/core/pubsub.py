@@ -0,0 +1,57 @@
+"""
+LUXORANOVA Pub/Sub - Resilient Redis channel subscriptions
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+from app.core.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+
+async def follow_channel(
+    channel: str,
+    on_message: Callable[[str], None],
+    on_subscribe: Optional[Callable[[], Awaitable[None]]] = None,
+    name: str = "Pub/sub",
+    retry_delay: float = 1.0,
+) -> None:
+    """
+    Deliver messages published on a Redis channel until cancelled.
+    
+    After a connection error the channel is subscribed to again once
+    ``retry_delay`` has passed. Messages published in between are lost, so
+    ``on_subscribe`` runs after every (re)subscription to catch up on them.
+    Run it as a background task and cancel the task to stop.
+    
+    Args:
+        channel: Channel name
+        on_message: Called with each message, decoded to str
+        on_subscribe: Awaited once subscribed, before messages are delivered
+        name: What the subscription is for, in log messages
+        retry_delay: Seconds to wait before subscribing again after an error
+    """
+    while True:
+        pubsub = redis_client._client.pubsub()
+        try:
+            await pubsub.subscribe(channel)
+            if on_subscribe is not None:
+                await on_subscribe()
+            
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                
+                data = message["data"]
+                if isinstance(data, bytes):
+                    data = data.decode()
+                on_message(data)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"{name} listener failed: {str(e)}")
+            await asyncio.sleep(retry_delay)
+        finally:
+            await pubsub.reset()
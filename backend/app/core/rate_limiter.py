@@ -0,0 +1,532 @@
+"""
+LUXORANOVA Rate Limiters
+"""
+
+import asyncio
+import logging
+import math
+import time
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple, Union
+
+from app.core.cache import TTLCache
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.config import settings
+from app.core.metrics import timed_phase
+from app.core.redis_client import redis_client
+from app.core.security import generate_rate_limit_key
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitResult(NamedTuple):
+    """Outcome of a rate limit check."""
+    allowed: bool
+    limit: int
+    remaining: int
+    # Seconds until the next request would be allowed (0 when allowed)
+    retry_after: float
+
+
+# ============================================================================
+# Rules
+# ============================================================================
+
+class RateLimitRule(NamedTuple):
+    """
+    A limit of ``limit`` requests per ``period`` seconds.
+    
+    ``burst`` is how many requests may arrive back to back before the
+    steady rate applies; it defaults to ``limit``.
+    """
+    name: str
+    limit: int
+    period: int = 60
+    burst: Optional[int] = None
+
+
+class RateLimitRules:
+    """
+    Rule table keyed by route prefix and subscription plan.
+    
+    Resolution order for a request is (route, plan), (route, any plan),
+    (plan), then the default rule. Call ``compile`` once at startup; lookups
+    after that are memoised per (path, plan).
+    """
+    
+    def __init__(self, default: RateLimitRule, default_plan: str = "free"):
+        self.default = default
+        self.default_plan = default_plan
+        self._plans: Dict[str, RateLimitRule] = {}
+        self._routes: Dict[str, Dict[Optional[str], RateLimitRule]] = {}
+        self._prefixes: List[str] = []
+        self.resolve = lru_cache(maxsize=4096)(self._resolve)
+    
+    def add(
+        self,
+        rule: RateLimitRule,
+        route: Optional[str] = None,
+        plan: Optional[str] = None,
+    ) -> "RateLimitRules":
+        """
+        Register a rule for a route prefix, a plan, or both.
+        
+        Args:
+            rule: Limit to apply
+            route: Path prefix such as "/api/v1/auth"
+            plan: Subscription plan name such as "professional"
+        
+        Returns:
+            The rule table, for chaining
+        """
+        if route is None and plan is None:
+            raise ValueError("A rate limit rule needs a route, a plan, or both")
+        
+        if route is None:
+            self._plans[plan] = rule
+        else:
+            self._routes.setdefault(route.rstrip("/"), {})[plan] = rule
+        
+        return self
+    
+    def compile(self) -> "RateLimitRules":
+        """Freeze the table: longest route prefix wins."""
+        self._prefixes = sorted(self._routes, key=len, reverse=True)
+        self.resolve.cache_clear()
+        return self
+    
+    def _resolve(self, path: str, plan: Optional[str]) -> RateLimitRule:
+        plan = plan or self.default_plan
+        
+        for prefix in self._prefixes:
+            if path == prefix or path.startswith(prefix + "/"):
+                by_plan = self._routes[prefix]
+                rule = by_plan.get(plan) or by_plan.get(None)
+                if rule:
+                    return rule
+        
+        return self._plans.get(plan, self.default)
+
+
+def build_rate_limit_rules() -> RateLimitRules:
+    """
+    Default rule table: RATE_LIMIT_PER_MINUTE for the free plan, higher
+    ceilings for paid plans and a tight limit on authentication routes.
+    
+    A caller's plan is the ``plan`` claim of its access token, resolved by
+    EdgeMiddleware; API key and anonymous callers get the free plan.
+    """
+    per_minute = settings.RATE_LIMIT_PER_MINUTE
+    
+    return (
+        RateLimitRules(RateLimitRule("default", per_minute, 60))
+        .add(RateLimitRule("plan:professional", per_minute * 5, 60), plan="professional")
+        .add(RateLimitRule("plan:enterprise", per_minute * 20, 60), plan="enterprise")
+        .add(RateLimitRule("auth", 10, 60), route="/api/v1/auth")
+        .compile()
+    )
+
+
+# ============================================================================
+# GCRA (one atomic EVALSHA per request)
+# ============================================================================
+
+# Generic Cell Rate Algorithm: store only the theoretical arrival time (TAT).
+#   KEYS[1] = limiter key
+#   ARGV[1] = emission interval in ms (period / limit)
+#   ARGV[2] = burst tolerance in ms (emission interval * burst)
+# Returns {allowed, remaining, retry_after_ms}
+GCRA_SCRIPT = """
+local emission = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+    tat = now
+end
+local new_tat = tat + emission
+local allow_at = new_tat - tolerance
+if now < allow_at then
+    return {0, 0, allow_at - now}
+end
+redis.call('SET', KEYS[1], new_tat, 'PX', math.ceil(new_tat - now))
+return {1, math.floor((tolerance - (new_tat - now)) / emission), 0}
+"""
+
+
+class GCRARateLimiter:
+    """
+    Redis GCRA limiter: one EVALSHA checks and updates the client's state.
+    
+    Unlike the fixed 60s window, GCRA refills continuously, so clients do not
+    all regain their full quota at the same instant, and ``retry_after`` is
+    the exact wait until the next request would conform.
+    
+    Every Redis call runs through a CircuitBreaker with a strict deadline.
+    When Redis is slow or down, requests are limited by a per-process
+    LocalGCRARateLimiter instead of each waiting out the Redis timeout, and
+    the breaker probes Redis in the background until it recovers.
+    """
+    
+    def __init__(
+        self,
+        rules: RateLimitRules,
+        deadline: float = 0.05,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        """
+        Args:
+            rules: Rule table
+            deadline: Seconds a Redis call may take before the local limiter answers
+            breaker: Breaker to use instead of the default "rate_limiter_redis" one
+        """
+        self.rules = rules
+        self.breaker = breaker or CircuitBreaker(
+            "rate_limiter_redis", probe=self._ping, deadline=deadline
+        )
+        self.fallback = LocalGCRARateLimiter(rules)
+        self._script = None
+    
+    async def start(self) -> None:
+        """Register the Lua script (call from the app lifespan)."""
+        if not redis_client._client:
+            await redis_client.connect()
+        
+        self._script = redis_client._client.register_script(GCRA_SCRIPT)
+    
+    async def stop(self) -> None:
+        """Stop the breaker's background probe."""
+        await self.breaker.stop()
+    
+    async def _ping(self) -> None:
+        await redis_client._client.ping()
+    
+    async def check(
+        self,
+        client_id: str,
+        path: str = "/",
+        plan: Optional[str] = None,
+    ) -> RateLimitResult:
+        """
+        Check and record one request for client_id.
+        
+        Args:
+            client_id: Client identifier
+            path: Request path, used to pick the rule
+            plan: Subscription plan of the caller, if known
+        
+        Returns:
+            RateLimitResult for the matching rule
+        """
+        rule = self.rules.resolve(path, plan)
+        if self.breaker.is_open:
+            return self.fallback.check_rule(client_id, rule)
+        
+        emission_ms, tolerance_ms = _gcra_params(rule)
+        
+        try:
+            with timed_phase("redis"):
+                allowed, remaining, retry_after_ms = await self.breaker.call(
+                    self._script,
+                    keys=[generate_rate_limit_key(client_id, rule.name)],
+                    args=[emission_ms, tolerance_ms],
+                )
+        except Exception as e:
+            logger.error(f"Rate limit check failed, using local limiter: {e!r}")
+            return self.fallback.check_rule(client_id, rule)
+        
+        return RateLimitResult(
+            bool(allowed),
+            rule.limit,
+            max(0, int(remaining)),
+            int(retry_after_ms) / 1000,
+        )
+
+
+@lru_cache(maxsize=256)
+def _gcra_params(rule: RateLimitRule) -> Tuple[int, int]:
+    """Emission interval and burst tolerance for a rule, in whole milliseconds."""
+    emission = math.ceil(rule.period * 1000 / rule.limit)
+    return emission, emission * (rule.burst or rule.limit)
+
+
+class LocalGCRARateLimiter:
+    """
+    In-process GCRA with the same rules and semantics as GCRARateLimiter.
+    
+    Used as the fallback while Redis is unavailable. State is per process,
+    so with N workers a client can get up to N times its limit; that is
+    still far better than failing open.
+    """
+    
+    def __init__(self, rules: RateLimitRules, max_clients: int = 100_000):
+        self.rules = rules
+        self._tats: TTLCache[int] = TTLCache(max_clients)
+    
+    async def check(
+        self,
+        client_id: str,
+        path: str = "/",
+        plan: Optional[str] = None,
+    ) -> RateLimitResult:
+        """Check and record one request for client_id (no I/O)."""
+        return self.check_rule(client_id, self.rules.resolve(path, plan))
+    
+    def check_rule(self, client_id: str, rule: RateLimitRule) -> RateLimitResult:
+        """Mirror of GCRA_SCRIPT for an already resolved rule."""
+        emission_ms, tolerance_ms = _gcra_params(rule)
+        key = (client_id, rule.name)
+        now = time.monotonic_ns() // 1_000_000
+        
+        tat = max(self._tats.get(key) or now, now)
+        new_tat = tat + emission_ms
+        allow_at = new_tat - tolerance_ms
+        if now < allow_at:
+            return RateLimitResult(False, rule.limit, 0, (allow_at - now) / 1000)
+        
+        self._tats.set(key, new_tat, (new_tat - now) / 1000)
+        remaining = (tolerance_ms - (new_tat - now)) // emission_ms
+        return RateLimitResult(True, rule.limit, max(0, remaining), 0.0)
+
+
+# ============================================================================
+# Leased Token Bucket (local hot path, batched Redis sync)
+# ============================================================================
+
+# Reserve tokens for one client in the current window.
+#   KEYS[1] = window counter
+#   ARGV[1] = limit, ARGV[2] = tokens wanted, ARGV[3] = ttl,
+#   ARGV[4] = tokens already handed out locally without a reservation (debt)
+# Returns {granted, reserved_total}
+LEASE_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local want = tonumber(ARGV[2])
+local ttl = tonumber(ARGV[3])
+local debt = tonumber(ARGV[4])
+local reserved = tonumber(redis.call('GET', KEYS[1]) or '0') + debt
+local grant = math.min(want, math.max(0, limit - reserved))
+reserved = reserved + grant
+redis.call('SET', KEYS[1], reserved, 'EX', ttl)
+return {grant, reserved}
+"""
+
+
+class _Bucket:
+    """Local share of one client's quota for a single window."""
+    
+    __slots__ = ("window", "tokens", "debt", "reserved", "granted")
+    
+    def __init__(self, window: int, tokens: int):
+        self.window = window
+        # Tokens this process may still hand out
+        self.tokens = tokens
+        # Tokens handed out before Redis has reserved them
+        self.debt = tokens
+        # Last known global reservation count for the window
+        self.reserved = tokens
+        # Tokens this process has been given in the window, leased or local
+        self.granted = tokens
+
+
+class LeasedRateLimiter:
+    """
+    Per-process token bucket that leases quota chunks from Redis.
+    
+    ``check`` never touches the network: it spends tokens from a local lease
+    and flags the client for a refill when the lease runs low. A background
+    task reconciles flagged clients with Redis in one pipelined round trip,
+    reporting optimistic grants and reserving the next chunk atomically.
+    
+    Across N workers the global limit can be overshot by at most
+    N * lease_size per window, and only for clients seen for the first time.
+    While Redis is unreachable each process grants itself leases locally, up
+    to the full limit per window, so a client gets at most N times its limit.
+    """
+    
+    def __init__(
+        self,
+        limit: int,
+        window: int = 60,
+        lease_size: Optional[int] = None,
+        sync_interval: float = 0.25,
+        key_prefix: str = "ratelimit:lease",
+    ):
+        self.limit = limit
+        self.window = window
+        self.lease_size = lease_size or max(1, limit // 10)
+        self.refill_threshold = max(1, self.lease_size // 4)
+        self.sync_interval = sync_interval
+        self.key_prefix = key_prefix
+        
+        self._buckets: Dict[str, _Bucket] = {}
+        self._pending: Set[str] = set()
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._script = None
+        self._evicted_window = 0
+    
+    # ------------------------------------------------------------------
+    # Hot path
+    # ------------------------------------------------------------------
+    
+    async def check(
+        self,
+        client_id: str,
+        path: str = "/",
+        plan: Optional[str] = None,
+    ) -> RateLimitResult:
+        """
+        Spend one token for client_id without any network I/O.
+        
+        Uses a single limit for every route and plan; ``path`` and ``plan``
+        are accepted so the limiter is interchangeable with GCRARateLimiter.
+        
+        Returns:
+            RateLimitResult with an approximate global remaining count
+        """
+        now = time.time()
+        window = int(now) // self.window
+        bucket = self._buckets.get(client_id)
+        
+        if bucket is None or bucket.window != window:
+            bucket = _Bucket(window, min(self.lease_size, self.limit))
+            self._buckets[client_id] = bucket
+            self._request_sync(client_id)
+        
+        if bucket.tokens <= 0:
+            self._request_sync(client_id)
+            return RateLimitResult(False, self.limit, 0, (window + 1) * self.window - now)
+        
+        bucket.tokens -= 1
+        if bucket.tokens <= self.refill_threshold:
+            self._request_sync(client_id)
+        
+        remaining = bucket.tokens + max(0, self.limit - bucket.reserved)
+        return RateLimitResult(True, self.limit, remaining, 0.0)
+    
+    def _request_sync(self, client_id: str) -> None:
+        self._pending.add(client_id)
+        self._wake.set()
+    
+    # ------------------------------------------------------------------
+    # Background reconciliation
+    # ------------------------------------------------------------------
+    
+    async def start(self) -> None:
+        """Start the background sync task (call from the app lifespan)."""
+        if not redis_client._client:
+            await redis_client.connect()
+        
+        self._script = redis_client._client.register_script(LEASE_SCRIPT)
+        self._task = asyncio.create_task(self._sync_loop())
+    
+    async def stop(self) -> None:
+        """Flush outstanding debt and stop the background sync task."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        
+        await self.sync()
+    
+    async def _sync_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.sync_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.error(f"Rate limit sync failed: {str(e)}")
+            
+            self._evict_expired()
+    
+    async def sync(self) -> None:
+        """Reconcile every flagged client with Redis in a single pipeline."""
+        if not self._pending or self._script is None:
+            return
+        
+        client_ids, self._pending = self._pending, set()
+        batch = []
+        for client_id in client_ids:
+            bucket = self._buckets.get(client_id)
+            if bucket is None:
+                continue
+            
+            want = self.lease_size if bucket.tokens <= self.refill_threshold else 0
+            batch.append((client_id, bucket, want, bucket.debt))
+        
+        if not batch:
+            return
+        
+        try:
+            pipe = redis_client._client.pipeline(transaction=False)
+            for client_id, bucket, want, debt in batch:
+                await self._script(
+                    keys=[f"{self.key_prefix}:{client_id}:{bucket.window}"],
+                    args=[self.limit, want, self.window * 2, debt],
+                    client=pipe,
+                )
+            results = await pipe.execute()
+        except Exception as e:
+            logger.error(f"Rate limit lease failed, granting local lease: {str(e)}")
+            # Limit per process until Redis is back: never grant a process
+            # more than the full limit in one window
+            for client_id, bucket, want, debt in batch:
+                grant = min(want, max(0, self.limit - bucket.granted))
+                bucket.tokens += grant
+                bucket.debt += grant
+                bucket.granted += grant
+            return
+        
+        for (client_id, bucket, want, debt), (granted, reserved) in zip(batch, results):
+            bucket.debt -= debt
+            bucket.reserved = int(reserved)
+            bucket.tokens += int(granted)
+            bucket.granted += int(granted)
+            
+            # Other workers spent the quota our optimistic grant assumed
+            overshoot = bucket.reserved - self.limit
+            if overshoot > 0 and debt:
+                bucket.tokens = max(0, bucket.tokens - min(overshoot, debt))
+    
+    def _evict_expired(self) -> None:
+        window = int(time.time()) // self.window
+        if window == self._evicted_window:
+            return
+        
+        self._evicted_window = window
+        expired = [
+            client_id for client_id, bucket in self._buckets.items()
+            if bucket.window < window
+        ]
+        for client_id in expired:
+            del self._buckets[client_id]
+
+
+# ============================================================================
+# Selection
+# ============================================================================
+
+def build_rate_limiter() -> Union[GCRARateLimiter, LeasedRateLimiter]:
+    """
+    Build the limiter named by the RATE_LIMITER setting.
+    
+    ``gcra`` (default): GCRARateLimiter with the per-route and per-plan rules
+    of build_rate_limit_rules; one Redis call per request.
+    ``leased``: LeasedRateLimiter with a single RATE_LIMIT_PER_MINUTE limit for
+    every route and plan; no Redis call on the request path.
+    """
+    kind = getattr(settings, "RATE_LIMITER", "gcra").strip().lower()
+    if kind == "gcra":
+        return GCRARateLimiter(build_rate_limit_rules())
+    if kind == "leased":
+        return LeasedRateLimiter(settings.RATE_LIMIT_PER_MINUTE, window=60)
+    raise ValueError(f"Unknown RATE_LIMITER {kind!r}; expected 'gcra' or 'leased'")
@@ -2,8 +2,15 @@
 LUXORANOVA Security Utilities
 """
 
+import asyncio
+import hashlib
+import hmac
+import logging
 import secrets
+import threading
+import time
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional, Dict, Any
 from passlib.context import CryptContext
 from jose import JWTError, jwt
@@ -11,8 +18,17 @@ import pyotp
 import qrcode
 from io import BytesIO
 import base64
+from urllib.parse import quote
 
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.encryption import DecryptionError, get_encryptor
+from app.core.jwt_keys import ASYMMETRIC_ALGORITHMS, jwt_keyring
+from app.core.password_hashing import password_hasher
+from app.core.singleflight import SingleFlight
+from app.core.token_revocation import token_revocations
+
+logger = logging.getLogger(__name__)
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -49,10 +65,86 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+async def hash_password_async(password: str) -> str:
+    """
+    Hash a password on the password hashing process pool.
+    
+    Use this from request handlers: bcrypt is deliberately slow and would
+    otherwise block the event loop for every other request.
+    
+    Args:
+        password: Plain text password
+        
+    Returns:
+        Hashed password
+        
+    Raises:
+        PasswordHasherBusy: Too many hash operations are queued
+    """
+    return await password_hasher.hash(password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password on the password hashing process pool.
+    
+    Use ``password_hasher.verify_and_update`` instead where the new hash can
+    be stored, so outdated hashes are upgraded in the background.
+    
+    Args:
+        plain_password: Plain text password
+        hashed_password: Hashed password
+        
+    Returns:
+        True if password matches, False otherwise
+        
+    Raises:
+        PasswordHasherBusy: Too many hash operations are queued
+    """
+    return await password_hasher.verify(plain_password, hashed_password)
+
+
 # ============================================================================
 # JWT Token Management
 # ============================================================================
 
+def encode_jwt(claims: Dict[str, Any]) -> str:
+    """
+    Sign claims with the configured algorithm.
+    
+    ES256 tokens are signed by the key ring and carry a ``kid`` header so
+    other services can verify them from the JWKS; HS* tokens use
+    JWT_SECRET_KEY.
+    
+    Args:
+        claims: Token claims
+        
+    Returns:
+        Encoded JWT token
+    """
+    if settings.JWT_ALGORITHM in ASYMMETRIC_ALGORITHMS:
+        return jwt_keyring.sign(claims)
+    return jwt.encode(claims, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+
+
+def decode_jwt(token: str) -> Dict[str, Any]:
+    """
+    Verify a token signed by encode_jwt and return its claims.
+    
+    Args:
+        token: JWT token to decode
+        
+    Returns:
+        Token claims
+        
+    Raises:
+        JWTError: The token is invalid or expired
+    """
+    if settings.JWT_ALGORITHM in ASYMMETRIC_ALGORITHMS:
+        return jwt_keyring.verify(token)
+    return jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+
+
 def create_access_token(
     data: Dict[str, Any],
     expires_delta: Optional[timedelta] = None
@@ -79,14 +171,11 @@ def create_access_token(
     to_encode.update({
         "exp": expire,
         "iat": datetime.utcnow(),
-        "type": "access"
+        "type": "access",
+        "jti": secrets.token_urlsafe(16)
     })
     
-    encoded_jwt = jwt.encode(
-        to_encode,
-        settings.JWT_SECRET_KEY,
-        algorithm=settings.JWT_ALGORITHM
-    )
+    encoded_jwt = encode_jwt(to_encode)
     
     return encoded_jwt
 
@@ -117,43 +206,85 @@ def create_refresh_token(
     to_encode.update({
         "exp": expire,
         "iat": datetime.utcnow(),
-        "type": "refresh"
+        "type": "refresh",
+        "jti": secrets.token_urlsafe(16)
     })
     
-    encoded_jwt = jwt.encode(
-        to_encode,
-        settings.JWT_SECRET_KEY,
-        algorithm=settings.JWT_ALGORITHM
-    )
+    encoded_jwt = encode_jwt(to_encode)
     
     return encoded_jwt
 
 
-def decode_token(token: str) -> Optional[Dict[str, Any]]:
+# Verified claims by token hash; entries expire with the token
+_claims_cache: TTLCache[Dict[str, Any]] = TTLCache(maxsize=10_000)
+_claims_cache_lock = threading.Lock()
+
+
+def _token_digest(token: str) -> str:
+    return hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+
+
+def get_token_id(payload: Dict[str, Any], token: str) -> str:
+    """
+    Get the revocation ID of a token.
+    
+    Args:
+        payload: Decoded token payload
+        token: The encoded token
+        
+    Returns:
+        The ``jti`` claim, or a hash of the token for tokens issued without one
+    """
+    return payload.get("jti") or _token_digest(token)
+
+
+def decode_token(token: str, expected_type: Optional[str] = None) -> Optional[Dict[str, Any]]:
     """
     Decode and verify a JWT token.
     
+    Verified claims are cached until the token expires, so repeat calls for
+    the same token skip signature verification. Revoked tokens are rejected
+    on every call.
+    
     Args:
         token: JWT token to decode
+        expected_type: Reject the token unless its type matches ('access' or 'refresh')
         
     Returns:
         Decoded token payload or None if invalid
     """
-    try:
-        payload = jwt.decode(
-            token,
-            settings.JWT_SECRET_KEY,
-            algorithms=[settings.JWT_ALGORITHM]
-        )
-        return payload
-    except JWTError:
+    digest = _token_digest(token)
+    with _claims_cache_lock:
+        payload = _claims_cache.get(digest)
+    
+    if payload is None:
+        try:
+            payload = decode_jwt(token)
+        except JWTError:
+            return None
+        
+        ttl = payload.get("exp", 0) - time.time()
+        if ttl > 0:
+            with _claims_cache_lock:
+                _claims_cache.set(digest, payload, ttl)
+    
+    if expected_type is not None and payload.get("type") != expected_type:
+        return None
+    
+    if token_revocations.is_revoked(payload.get("jti") or digest):
         return None
+    
+    # Callers may modify the payload; keep the cached copy intact
+    return dict(payload)
 
 
 def verify_token_type(token: str, expected_type: str) -> bool:
     """
     Verify the type of a JWT token.
     
+    Prefer ``decode_token(token, expected_type)`` when the payload is also
+    needed, so the token is looked up only once.
+    
     Args:
         token: JWT token to verify
         expected_type: Expected token type ('access' or 'refresh')
@@ -161,11 +292,43 @@ def verify_token_type(token: str, expected_type: str) -> bool:
     Returns:
         True if token type matches, False otherwise
     """
+    return decode_token(token, expected_type) is not None
+
+
+def get_token_plan(token: str) -> Optional[str]:
+    """
+    Get the subscription plan of a valid access token.
+    
+    Used by EdgeMiddleware to pick per-plan rate limits before routing;
+    verified claims are cached, so repeat calls skip signature checks.
+    
+    Args:
+        token: JWT access token
+        
+    Returns:
+        The ``plan`` claim, or None if the token is invalid or has no plan
+    """
+    payload = decode_token(token, "access")
+    return payload.get("plan") if payload else None
+
+
+async def revoke_token(token: str) -> bool:
+    """
+    Revoke a token (e.g. on logout or refresh token rotation) in every
+    process until it expires.
+    
+    Args:
+        token: JWT token to revoke
+        
+    Returns:
+        True if the token was valid and is now revoked, False otherwise
+    """
     payload = decode_token(token)
     if not payload:
         return False
     
-    return payload.get("type") == expected_type
+    await token_revocations.revoke(get_token_id(payload, token), payload["exp"])
+    return True
 
 
 # ============================================================================
@@ -193,23 +356,67 @@ def generate_api_key() -> tuple[str, str]:
     return full_key, prefix
 
 
+# Scheme marker for keyed API key hashes; anything else is a legacy bcrypt hash
+API_KEY_HASH_SCHEME = "hmac-sha256"
+
+
+@lru_cache(maxsize=1)
+def _api_key_hmac_key() -> bytes:
+    """
+    HMAC key for API key hashes, derived from API_KEY_HASH_SECRET.
+    
+    The secret must stay fixed for as long as issued keys are valid, so it is
+    separate from JWT_SECRET_KEY; the JWT secret is only a fallback for
+    deployments that have not set it (rotating it then invalidates API keys).
+    """
+    secret = getattr(settings, "API_KEY_HASH_SECRET", None)
+    if not secret:
+        logger.warning("API_KEY_HASH_SECRET is not set; API key hashes depend on JWT_SECRET_KEY")
+        secret = settings.JWT_SECRET_KEY
+    return hmac.new(
+        secret.encode(),
+        b"luxoranova:api-key-hash:v1",
+        hashlib.sha256
+    ).digest()
+
+
+def get_api_key_prefix(api_key: str) -> str:
+    """
+    Get the lookup prefix of an API key (as returned by generate_api_key).
+    
+    Args:
+        api_key: Full API key
+        
+    Returns:
+        Prefix to look the key up by
+    """
+    return api_key[:len(settings.API_KEY_PREFIX) + 8]
+
+
 def hash_api_key(api_key: str) -> str:
     """
     Hash an API key for storage.
     
+    API keys carry 256 bits of entropy, so a keyed HMAC-SHA256 is as strong
+    as a slow password hash against guessing while costing microseconds
+    instead of a bcrypt round per request.
+    
     Args:
         api_key: API key to hash
         
     Returns:
-        Hashed API key
+        Hashed API key ("hmac-sha256$<hex>")
     """
-    return hash_password(api_key)
+    digest = hmac.new(_api_key_hmac_key(), api_key.encode(), hashlib.sha256).hexdigest()
+    return f"{API_KEY_HASH_SCHEME}${digest}"
 
 
 def verify_api_key(plain_key: str, hashed_key: str) -> bool:
     """
     Verify an API key against a hash.
     
+    Legacy bcrypt hashes are still accepted; see api_key_needs_rehash.
+    
     Args:
         plain_key: Plain text API key
         hashed_key: Hashed API key
@@ -217,9 +424,25 @@ def verify_api_key(plain_key: str, hashed_key: str) -> bool:
     Returns:
         True if key matches, False otherwise
     """
+    if hashed_key.startswith(API_KEY_HASH_SCHEME + "$"):
+        return hmac.compare_digest(hash_api_key(plain_key), hashed_key)
+    
     return verify_password(plain_key, hashed_key)
 
 
+def api_key_needs_rehash(hashed_key: str) -> bool:
+    """
+    Check whether a stored API key hash predates the keyed-hash scheme.
+    
+    Args:
+        hashed_key: Stored hash
+        
+    Returns:
+        True if the hash should be replaced with hash_api_key(key)
+    """
+    return not hashed_key.startswith(API_KEY_HASH_SCHEME + "$")
+
+
 # ============================================================================
 # Multi-Factor Authentication (MFA)
 # ============================================================================
@@ -234,16 +457,20 @@ def generate_mfa_secret() -> str:
     return pyotp.random_base32()
 
 
-def generate_mfa_qr_code(secret: str, email: str) -> str:
+def generate_mfa_qr_code(secret: str, email: str, image_format: str = "png") -> str:
     """
     Generate a QR code for MFA setup.
     
+    Renders synchronously; request handlers should use
+    generate_mfa_qr_code_async instead.
+    
     Args:
         secret: MFA secret
         email: User email
+        image_format: 'png' or 'svg' (vector, crisp at any size, cheaper to render)
         
     Returns:
-        Base64 encoded QR code image
+        QR code image as a data URI
     """
     # Create provisioning URI
     totp = pyotp.TOTP(secret)
@@ -257,6 +484,13 @@ def generate_mfa_qr_code(secret: str, email: str) -> str:
     qr.add_data(uri)
     qr.make(fit=True)
     
+    if image_format == "svg":
+        # Percent-encoded rather than base64: shorter, and stays compressible
+        svg = quote(_qr_matrix_to_svg(qr.get_matrix()), safe=" /=:.'")
+        return f"data:image/svg+xml,{svg}"
+    if image_format != "png":
+        raise ValueError(f"Unsupported QR code format: {image_format}")
+    
     img = qr.make_image(fill_color="black", back_color="white")
     
     # Convert to base64
@@ -267,6 +501,68 @@ def generate_mfa_qr_code(secret: str, email: str) -> str:
     return f"data:image/png;base64,{img_str}"
 
 
+def _qr_matrix_to_svg(matrix: list[list[bool]]) -> str:
+    # One stroked segment per horizontal run of dark modules, in module
+    # units; the viewBox scales it to any size without decimals in the path
+    size = len(matrix)
+    runs = []
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < size:
+            if not row[x]:
+                x += 1
+                continue
+            start = x
+            while x < size and row[x]:
+                x += 1
+            runs.append(f"M{start} {y}.5h{x - start}")
+    
+    return (
+        f"<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 {size} {size}' "
+        f"shape-rendering='crispEdges'><path fill='#fff' d='M0 0h{size}v{size}H0z'/>"
+        f"<path stroke='#000' d='{''.join(runs)}'/></svg>"
+    )
+
+
+# Rendered enrollment QR codes by hash of (secret, email, format)
+MFA_QR_CACHE_TTL = 300
+_mfa_qr_cache: TTLCache[str] = TTLCache(maxsize=1024)
+_mfa_qr_renders: SingleFlight[str] = SingleFlight("mfa_qr")
+
+
+async def generate_mfa_qr_code_async(secret: str, email: str, image_format: str = "svg") -> str:
+    """
+    Generate a QR code for MFA setup without blocking the event loop.
+    
+    Rendering runs in a worker thread. Results are cached for a few minutes
+    so reloading the enrollment page is free, and concurrent requests for
+    the same code share one render.
+    
+    Args:
+        secret: MFA secret
+        email: User email
+        image_format: 'svg' (default) or 'png'
+        
+    Returns:
+        QR code image as a data URI
+    """
+    key = hashlib.blake2b(
+        f"{secret}\0{email}\0{image_format}".encode(), digest_size=16
+    ).hexdigest()
+    
+    qr_code = _mfa_qr_cache.get(key)
+    if qr_code is None:
+        qr_code = await _mfa_qr_renders.do(key, _render_mfa_qr_code, key, secret, email, image_format)
+    
+    return qr_code
+
+
+async def _render_mfa_qr_code(key: str, secret: str, email: str, image_format: str) -> str:
+    qr_code = await asyncio.to_thread(generate_mfa_qr_code, secret, email, image_format)
+    _mfa_qr_cache.set(key, qr_code, MFA_QR_CACHE_TTL)
+    return qr_code
+
+
 def verify_mfa_code(secret: str, code: str) -> bool:
     """
     Verify an MFA code.
@@ -317,11 +613,7 @@ def create_password_reset_token(email: str) -> str:
     expire = datetime.utcnow() + timedelta(hours=1)
     data.update({"exp": expire})
     
-    token = jwt.encode(
-        data,
-        settings.JWT_SECRET_KEY,
-        algorithm=settings.JWT_ALGORITHM
-    )
+    token = encode_jwt(data)
     
     return token
 
@@ -337,11 +629,7 @@ def verify_password_reset_token(token: str) -> Optional[str]:
         Email if token is valid, None otherwise
     """
     try:
-        payload = jwt.decode(
-            token,
-            settings.JWT_SECRET_KEY,
-            algorithms=[settings.JWT_ALGORITHM]
-        )
+        payload = decode_jwt(token)
         
         if payload.get("type") != "password_reset":
             return None
@@ -373,11 +661,7 @@ def create_email_verification_token(email: str) -> str:
     expire = datetime.utcnow() + timedelta(days=7)
     data.update({"exp": expire})
     
-    token = jwt.encode(
-        data,
-        settings.JWT_SECRET_KEY,
-        algorithm=settings.JWT_ALGORITHM
-    )
+    token = encode_jwt(data)
     
     return token
 
@@ -393,11 +677,7 @@ def verify_email_verification_token(token: str) -> Optional[str]:
         Email if token is valid, None otherwise
     """
     try:
-        payload = jwt.decode(
-            token,
-            settings.JWT_SECRET_KEY,
-            algorithms=[settings.JWT_ALGORITHM]
-        )
+        payload = decode_jwt(token)
         
         if payload.get("type") != "email_verification":
             return None
@@ -453,34 +733,53 @@ def verify_csrf_token(token: str, expected_token: str) -> bool:
 # Encryption Utilities
 # ============================================================================
 
-def encrypt_data(data: str) -> str:
+# Marks envelope-encrypted values; anything else is the old base64 placeholder
+ENCRYPTED_DATA_PREFIX = "enc:v1:"
+
+
+def encrypt_data(data: str, context: str = "") -> str:
     """
     Encrypt sensitive data.
     
+    Uses AES-256-GCM envelope encryption (see app.core.encryption).
+    
     Args:
         data: Data to encrypt
+        context: Optional associated data (e.g. the owning record's ID) that
+            must match on decryption
         
     Returns:
         Encrypted data
     """
-    # TODO: Implement encryption using cryptography library
-    # For now, return base64 encoded (NOT SECURE - placeholder)
-    return base64.b64encode(data.encode()).decode()
+    ciphertext = get_encryptor().encrypt(data.encode(), context.encode())
+    return ENCRYPTED_DATA_PREFIX + base64.urlsafe_b64encode(ciphertext).decode()
 
 
-def decrypt_data(encrypted_data: str) -> str:
+def decrypt_data(encrypted_data: str, context: str = "") -> str:
     """
     Decrypt sensitive data.
     
     Args:
         encrypted_data: Encrypted data
+        context: Associated data given to encrypt_data
         
     Returns:
         Decrypted data
+        
+    Raises:
+        DecryptionError: The data is corrupt, was tampered with or the
+            context does not match
     """
-    # TODO: Implement decryption using cryptography library
-    # For now, return base64 decoded (NOT SECURE - placeholder)
-    return base64.b64decode(encrypted_data.encode()).decode()
+    if not encrypted_data.startswith(ENCRYPTED_DATA_PREFIX):
+        # Written by the old base64 placeholder; re-encrypt on next save
+        return base64.b64decode(encrypted_data.encode()).decode()
+    
+    try:
+        ciphertext = base64.urlsafe_b64decode(encrypted_data[len(ENCRYPTED_DATA_PREFIX):])
+    except ValueError:
+        raise DecryptionError("Encrypted data is not valid base64") from None
+    
+    return get_encryptor().decrypt(ciphertext, context.encode()).decode()
 
 
 # ============================================================================
@@ -0,0 +1,256 @@
+"""
+LUXORANOVA Sessions - Redis session store with a pub/sub-invalidated near-cache
+"""
+
+import asyncio
+import json
+import logging
+import secrets
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Set
+
+from prometheus_client import Counter
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.pubsub import follow_channel
+from app.core.redis_client import redis_client
+from app.core.security import generate_csrf_token, generate_session_id, verify_csrf_token
+
+logger = logging.getLogger(__name__)
+
+SESSION_LOOKUPS = Counter(
+    "session_lookups_total",
+    "Session lookups by where they were answered (near_cache, redis, missing)",
+    ["outcome"],
+)
+
+SESSION_TOUCHES = Counter(
+    "session_touches_flushed_total",
+    "Sliding-expiry refreshes written to Redis",
+)
+
+
+class Session(NamedTuple):
+    """A server-side session; change it with ``_replace`` and SessionStore.update."""
+    id: str
+    user_id: str
+    csrf_token: str
+    created_at: float
+    data: Dict[str, Any]
+
+
+def _encode(session: Session) -> str:
+    return json.dumps({
+        "user_id": session.user_id,
+        "csrf_token": session.csrf_token,
+        "created_at": session.created_at,
+        "data": session.data,
+    })
+
+
+def _decode(session_id: str, raw: Any) -> Session:
+    fields = json.loads(raw)
+    return Session(
+        session_id,
+        fields["user_id"],
+        fields["csrf_token"],
+        fields["created_at"],
+        fields.get("data", {}),
+    )
+
+
+class SessionStore:
+    """
+    Sessions in Redis with sliding expiry.
+    
+    Redis is the source of truth. Each process keeps recently used sessions
+    in a small near-cache for ``near_cache_ttl`` seconds; updates and
+    deletions are published so other processes drop their copy at once.
+    
+    Sliding expiry is not written per request: a session is refreshed at
+    most once per ``touch_interval`` per process, and pending refreshes are
+    sent as a single pipeline every ``flush_interval``. A session in active
+    use therefore costs one pipelined EXPIRE per minute (by default) and
+    otherwise no Redis commands at all.
+    
+    Each session holds its CSRF token; see verify_csrf and rotate_csrf.
+    """
+    
+    KEY_PREFIX = "session:"
+    CHANNEL = "session:invalidate"
+    
+    def __init__(
+        self,
+        ttl: int,
+        near_cache_size: int = 10_000,
+        near_cache_ttl: float = 30.0,
+        touch_interval: float = 60.0,
+        flush_interval: float = 1.0,
+    ):
+        """
+        Args:
+            ttl: Idle seconds before a session expires
+            near_cache_size: Maximum sessions cached per process
+            near_cache_ttl: Seconds a cached session is served without Redis;
+                bounds staleness if an invalidation message is lost
+            touch_interval: Minimum seconds between expiry refreshes of a session
+            flush_interval: Seconds between pipelined refresh batches
+        """
+        self.ttl = ttl
+        self.near_cache_ttl = near_cache_ttl
+        self.touch_interval = touch_interval
+        self.flush_interval = flush_interval
+        
+        self._near: TTLCache[Session] = TTLCache(near_cache_size)
+        self._touched: TTLCache[bool] = TTLCache(near_cache_size)
+        self._pending: Set[str] = set()
+        self._origin = secrets.token_hex(8)
+        self._tasks: List[asyncio.Task] = []
+    
+    async def start(self) -> None:
+        """Follow invalidations and flush touches (call from the app lifespan)."""
+        if not redis_client._client:
+            await redis_client.connect()
+        
+        self._tasks = [
+            asyncio.create_task(follow_channel(
+                self.CHANNEL, self._on_invalidation, self._on_subscribe, "Session invalidation"
+            )),
+            asyncio.create_task(self._flush_loop()),
+        ]
+    
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        
+        await self._flush()
+    
+    async def create(self, user_id: str, data: Optional[Dict[str, Any]] = None) -> Session:
+        """
+        Start a session with a fresh CSRF token.
+        
+        Args:
+            user_id: Owner of the session
+            data: Initial session data
+        
+        Returns:
+            The new session
+        """
+        session = Session(generate_session_id(), user_id, generate_csrf_token(), time.time(), data or {})
+        await redis_client._client.set(self.KEY_PREFIX + session.id, _encode(session), ex=self.ttl)
+        
+        self._near.set(session.id, session, self.near_cache_ttl)
+        self._touched.set(session.id, True, self.touch_interval)
+        return session
+    
+    async def get(self, session_id: str) -> Optional[Session]:
+        """
+        Load a session and extend its expiry.
+        
+        Args:
+            session_id: Session ID from the client
+        
+        Returns:
+            Session, or None if it does not exist or has expired
+        """
+        session = self._near.get(session_id)
+        if session is not None:
+            SESSION_LOOKUPS.labels("near_cache").inc()
+        else:
+            raw = await redis_client._client.get(self.KEY_PREFIX + session_id)
+            if raw is None:
+                SESSION_LOOKUPS.labels("missing").inc()
+                return None
+            
+            SESSION_LOOKUPS.labels("redis").inc()
+            session = _decode(session_id, raw)
+            self._near.set(session_id, session, self.near_cache_ttl)
+        
+        if self._touched.get(session_id) is None:
+            self._touched.set(session_id, True, self.touch_interval)
+            self._pending.add(session_id)
+        return session
+    
+    async def update(self, session: Session) -> None:
+        """Save a changed session and drop stale copies in other processes."""
+        key = self.KEY_PREFIX + session.id
+        pipe = redis_client._client.pipeline(transaction=False)
+        pipe.set(key, _encode(session), ex=self.ttl)
+        pipe.publish(self.CHANNEL, f"{self._origin}:{session.id}")
+        await pipe.execute()
+        
+        self._near.set(session.id, session, self.near_cache_ttl)
+        self._touched.set(session.id, True, self.touch_interval)
+        self._pending.discard(session.id)
+    
+    async def delete(self, session_id: str) -> None:
+        """End a session everywhere (logout)."""
+        pipe = redis_client._client.pipeline(transaction=False)
+        pipe.delete(self.KEY_PREFIX + session_id)
+        pipe.publish(self.CHANNEL, f"{self._origin}:{session_id}")
+        await pipe.execute()
+        
+        self._forget(session_id)
+    
+    def verify_csrf(self, session: Session, token: Optional[str]) -> bool:
+        """Check a submitted CSRF token against the session's."""
+        return token is not None and verify_csrf_token(token, session.csrf_token)
+    
+    async def rotate_csrf(self, session: Session) -> Session:
+        """Issue a new CSRF token for the session (e.g. after login or privilege change)."""
+        session = session._replace(csrf_token=generate_csrf_token())
+        await self.update(session)
+        return session
+    
+    def _forget(self, session_id: str) -> None:
+        self._near.delete(session_id)
+        self._touched.delete(session_id)
+        self._pending.discard(session_id)
+    
+    async def _flush(self) -> None:
+        if not self._pending:
+            return
+        
+        session_ids, self._pending = list(self._pending), set()
+        pipe = redis_client._client.pipeline(transaction=False)
+        for session_id in session_ids:
+            pipe.expire(self.KEY_PREFIX + session_id, self.ttl)
+        try:
+            results = await pipe.execute()
+        except Exception:
+            self._pending.update(session_ids)
+            raise
+        SESSION_TOUCHES.inc(len(session_ids))
+        
+        for session_id, exists in zip(session_ids, results):
+            if not exists:
+                # Expired or deleted elsewhere
+                self._forget(session_id)
+    
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self._flush()
+            except Exception as e:
+                logger.warning(f"Session touch flush failed: {str(e)}")
+    
+    async def _on_subscribe(self) -> None:
+        # Invalidations may have been missed while disconnected
+        self._near.clear()
+    
+    def _on_invalidation(self, data: str) -> None:
+        origin, _, session_id = data.partition(":")
+        if origin != self._origin:
+            self._near.delete(session_id)
+
+
+# Shared session store
+session_store = SessionStore(ttl=settings.REDIS_SESSION_TTL)
@@ -0,0 +1,82 @@
+"""
+LUXORANOVA Singleflight - Collapse concurrent identical work into one call
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+from prometheus_client import Counter
+
+T = TypeVar("T")
+
+SINGLEFLIGHT_CALLS = Counter(
+    "singleflight_calls_total",
+    "Calls through a singleflight group by role",
+    ["group", "role"],
+)
+
+
+class _Flight(Generic[T]):
+    __slots__ = ("task", "waiters")
+    
+    def __init__(self, task: "asyncio.Task[T]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight(Generic[T]):
+    """
+    Run at most one call per key at a time; concurrent callers with the same
+    key share its result (or exception).
+    
+    The shared call runs in its own task, so a caller that is cancelled
+    (e.g. its client disconnected) only stops waiting; the call carries on
+    for everyone else. It is cancelled only once every caller has gone.
+    Nothing is kept after the call finishes, so this never serves stale
+    data.
+    """
+    
+    def __init__(self, name: str):
+        """
+        Args:
+            name: Group name, used as the metrics label
+        """
+        self.name = name
+        self._flights: Dict[Hashable, _Flight[T]] = {}
+    
+    def __len__(self) -> int:
+        return len(self._flights)
+    
+    async def do(self, key: Hashable, func: Callable[..., Awaitable[T]], *args: Any) -> T:
+        """
+        Await func(*args), or join the call already in flight for key.
+        
+        Args:
+            key: Identity of the work; equal keys must mean equal results
+            func: Coroutine function doing the work
+            *args: Arguments for func
+        
+        Returns:
+            The shared result
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            SINGLEFLIGHT_CALLS.labels(self.name, "leader").inc()
+            flight = _Flight(asyncio.create_task(func(*args)))
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+            self._flights[key] = flight
+        else:
+            SINGLEFLIGHT_CALLS.labels(self.name, "follower").inc()
+        
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Nobody is interested any more
+                flight.task.cancel()
+    
+    def _forget(self, key: Hashable, flight: _Flight[T]) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
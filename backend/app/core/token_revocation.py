@@ -0,0 +1,164 @@
+"""
+LUXORANOVA Token Revocation - Bloom-filtered revocation set synchronised via Redis
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from typing import Dict, Iterator, List
+
+from app.core.pubsub import follow_channel
+from app.core.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+    
+    ``might_contain`` never returns a false negative; false positives occur
+    at roughly ``error_rate`` once ``capacity`` items have been added.
+    """
+    
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.01):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+    
+    def _positions(self, item: str) -> Iterator[int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        # Kirsch-Mitzenmacher double hashing
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+    
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+    
+    def might_contain(self, item: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class TokenRevocationList:
+    """
+    Revoked token IDs, replicated to every process.
+    
+    Redis holds the authoritative set as a sorted set scored by each token's
+    expiry, so entries disappear once the token could no longer be used
+    anyway. Each process keeps an exact local copy fronted by a Bloom
+    filter: the common case (token not revoked) is answered by the filter,
+    and the exact set weeds out its false positives. New revocations are
+    pushed over pub/sub and take effect everywhere immediately; a periodic
+    resync covers messages missed while disconnected.
+    """
+    
+    KEY = "auth:revoked_tokens"
+    CHANNEL = "auth:revoked_tokens"
+    
+    def __init__(self, capacity: int = 100_000, resync_interval: float = 60.0):
+        """
+        Args:
+            capacity: Expected number of live revocations (sizes the filter)
+            resync_interval: Seconds between full resyncs and expiry pruning
+        """
+        self.capacity = capacity
+        self.resync_interval = resync_interval
+        
+        self._revoked: Dict[str, float] = {}
+        self._filter = BloomFilter(capacity)
+        self._tasks: List[asyncio.Task] = []
+    
+    def is_revoked(self, token_id: str) -> bool:
+        """Check a token ID against the local copy (no I/O)."""
+        return self._filter.might_contain(token_id) and token_id in self._revoked
+    
+    async def revoke(self, token_id: str, expires_at: float) -> None:
+        """
+        Revoke a token everywhere until it expires.
+        
+        Args:
+            token_id: Token ID (the ``jti`` claim)
+            expires_at: Unix time the token expires (its ``exp`` claim)
+        """
+        self._add(token_id, expires_at)
+        
+        try:
+            pipe = redis_client._client.pipeline(transaction=False)
+            pipe.zadd(self.KEY, {token_id: expires_at})
+            pipe.publish(self.CHANNEL, f"{token_id}:{expires_at}")
+            await pipe.execute()
+        except Exception as e:
+            logger.error(f"Token revocation broadcast failed: {str(e)}")
+            raise
+    
+    async def start(self) -> None:
+        """Load the revocation set and follow updates (call from the app lifespan)."""
+        if not redis_client._client:
+            await redis_client.connect()
+        
+        await self._resync()
+        self._tasks = [
+            asyncio.create_task(
+                follow_channel(self.CHANNEL, self._on_message, self._resync, "Token revocation")
+            ),
+            asyncio.create_task(self._resync_loop()),
+        ]
+    
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+    
+    def _add(self, token_id: str, expires_at: float) -> None:
+        self._revoked[token_id] = expires_at
+        self._filter.add(token_id)
+    
+    async def _resync(self) -> None:
+        now = time.time()
+        pipe = redis_client._client.pipeline(transaction=False)
+        pipe.zremrangebyscore(self.KEY, "-inf", now)
+        pipe.zrangebyscore(self.KEY, now, "+inf", withscores=True)
+        _, entries = await pipe.execute()
+        
+        revoked = {
+            (token_id.decode() if isinstance(token_id, bytes) else token_id): float(expires_at)
+            for token_id, expires_at in entries
+        }
+        # Keep local revocations that have not reached Redis yet
+        revoked.update(
+            (token_id, expires_at)
+            for token_id, expires_at in self._revoked.items()
+            if expires_at > now
+        )
+        
+        # Rebuild so expired IDs stop costing filter false positives
+        bloom = BloomFilter(max(self.capacity, len(revoked)))
+        for token_id in revoked:
+            bloom.add(token_id)
+        self._revoked, self._filter = revoked, bloom
+    
+    async def _resync_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.resync_interval)
+            try:
+                await self._resync()
+            except Exception as e:
+                logger.warning(f"Token revocation resync failed: {str(e)}")
+    
+    def _on_message(self, data: str) -> None:
+        token_id, _, expires_at = data.rpartition(":")
+        self._add(token_id, float(expires_at))
+
+
+# Shared revocation list
+token_revocations = TokenRevocationList()
@@ -0,0 +1,91 @@
+"""
+Coalescing Middleware - One handler run for concurrent identical GETs
+"""
+
+import asyncio
+import hashlib
+from typing import List, Sequence
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.singleflight import SingleFlight
+from app.middleware.compression import negotiate_encoding
+
+
+class CoalescingMiddleware:
+    """
+    Collapse concurrent identical GET requests into a single handler run.
+    
+    Opt-in per path prefix. Requests are identical when path, query string,
+    negotiated Content-Encoding, Origin and credentials (Authorization, API
+    key and Cookie) all match, so callers never receive someone else's data
+    or CORS headers. The first
+    request runs the handler and every request that arrives while it is in
+    flight receives a copy of the same response bytes. Nothing is kept once
+    the response is complete; pair with ResponseCacheMiddleware for reuse
+    over time.
+    
+    The response is buffered in full before anyone receives it, so only
+    opt in paths that return bounded, non-streaming bodies.
+    """
+    
+    def __init__(self, app: ASGIApp, paths: Sequence[str]) -> None:
+        self.app = app
+        self.paths = tuple(path.rstrip("/") for path in paths)
+        self.api_key_header = settings.API_KEY_HEADER.lower()
+        self.flights: SingleFlight[List[Message]] = SingleFlight("http")
+    
+    def _matches(self, path: str) -> bool:
+        return any(path == prefix or path.startswith(prefix + "/") for prefix in self.paths)
+    
+    def _key(self, scope: Scope) -> str:
+        headers = Headers(scope=scope)
+        parts = [
+            scope["method"],
+            scope["path"],
+            scope["query_string"].decode("latin-1"),
+            negotiate_encoding(headers.get("accept-encoding", "")) or "identity",
+            headers.get("origin", ""),
+            headers.get("authorization", ""),
+            headers.get(self.api_key_header, ""),
+            headers.get("cookie", ""),
+        ]
+        # Hash so credentials are not held as dict keys
+        return hashlib.blake2b("\n".join(parts).encode(), digest_size=16).hexdigest()
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in ("GET", "HEAD")
+            or not self._matches(scope["path"])
+        ):
+            await self.app(scope, receive, send)
+            return
+        
+        messages = await self.flights.do(self._key(scope), self._run, scope)
+        for message in messages:
+            # Outer middleware may edit headers in place; give each caller a copy
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": list(message["headers"])}
+            await send(message)
+    
+    async def _run(self, scope: Scope) -> List[Message]:
+        """Run the handler detached from any one client and record its response."""
+        messages: List[Message] = []
+        body_received = False
+        
+        async def receive() -> Message:
+            nonlocal body_received
+            if not body_received:
+                body_received = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            # No client is attached, so a disconnect never arrives
+            await asyncio.Future()
+        
+        async def send(message: Message) -> None:
+            messages.append(message)
+        
+        await self.app(scope, receive, send)
+        return messages
@@ -0,0 +1,285 @@
+"""
+Compression Middleware - Negotiated zstd/brotli/gzip with load-aware levels
+"""
+
+import asyncio
+import zlib
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.load_monitor import LoadMonitor, PRESSURE_NORMAL
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+
+# Already compressed or not worth compressing
+EXCLUDED_CONTENT_TYPES = frozenset({
+    "application/gzip",
+    "application/x-gzip",
+    "application/zip",
+    "application/zstd",
+    "application/octet-stream",
+    "application/pdf",
+    "application/grpc",
+    "audio/*",
+    "font/woff",
+    "font/woff2",
+    "image/*",
+    "text/event-stream",
+    "video/*",
+})
+
+# SVG is text even though it lives under image/
+ALWAYS_COMPRESSIBLE_CONTENT_TYPES = frozenset({"image/svg+xml"})
+
+
+# ============================================================================
+# Codecs
+# ============================================================================
+
+class _GzipCompressor:
+    def __init__(self, level: int):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+    
+    def finish(self, data: bytes) -> bytes:
+        return self._obj.compress(data) + self._obj.flush()
+
+
+class _BrotliCompressor:
+    def __init__(self, level: int):
+        self._obj = brotli.Compressor(quality=level)
+    
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.process(data) + self._obj.flush()
+    
+    def finish(self, data: bytes) -> bytes:
+        return self._obj.process(data) + self._obj.finish()
+
+
+class _ZstdCompressor:
+    def __init__(self, level: int):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+    
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data) + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+    
+    def finish(self, data: bytes) -> bytes:
+        return self._obj.compress(data) + self._obj.flush()
+
+
+# Compression level per load pressure (normal, elevated, high). The normal
+# levels are the usual speed/ratio sweet spots rather than the maximum.
+CODECS: Dict[str, Tuple[type, Tuple[int, int, int]]] = {"gzip": (_GzipCompressor, (6, 4, 1))}
+if brotli is not None:
+    CODECS["br"] = (_BrotliCompressor, (5, 4, 1))
+if zstandard is not None:
+    CODECS["zstd"] = (_ZstdCompressor, (3, 2, 1))
+
+# Server preference when the client accepts several encodings equally
+PREFERENCE = ("zstd", "br", "gzip")
+
+
+@lru_cache(maxsize=256)
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick the best available encoding for an Accept-Encoding header.
+    
+    Args:
+        accept_encoding: Raw Accept-Encoding header value
+    
+    Returns:
+        "zstd", "br", "gzip" or None for identity
+    """
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding.strip()] = q
+    
+    wildcard = weights.get("*", 0.0)
+    best: Optional[str] = None
+    best_q = 0.0
+    for coding in PREFERENCE:
+        if coding not in CODECS:
+            continue
+        q = weights.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    
+    return best
+
+
+@lru_cache(maxsize=256)
+def is_compressible(content_type: str) -> bool:
+    """Check whether a Content-Type is worth compressing."""
+    media_type = content_type.partition(";")[0].strip().lower()
+    if not media_type or media_type in ALWAYS_COMPRESSIBLE_CONTENT_TYPES:
+        return bool(media_type)
+    
+    return (
+        media_type not in EXCLUDED_CONTENT_TYPES
+        and media_type.partition("/")[0] + "/*" not in EXCLUDED_CONTENT_TYPES
+    )
+
+
+# ============================================================================
+# Middleware
+# ============================================================================
+
+class CompressionMiddleware:
+    """
+    Pure ASGI response compression replacing GZipMiddleware.
+    
+    - Negotiates zstd, brotli or gzip (brotli and zstd when the optional
+      ``brotli``/``zstandard`` packages are installed).
+    - Compresses streaming responses chunk by chunk, flushing each chunk so
+      clients receive data as it is produced.
+    - Leaves already-encoded responses, excluded paths and incompressible
+      content types untouched.
+    - Drops to cheaper levels when the LoadMonitor reports event loop lag
+      or high CPU, and moves large single-shot bodies off the event loop.
+    """
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1000,
+        load_monitor: Optional[LoadMonitor] = None,
+        exclude_paths: Tuple[str, ...] = ("/metrics",),
+        thread_minimum_size: int = 256 * 1024,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.load_monitor = load_monitor
+        self.exclude_paths = exclude_paths
+        self.thread_minimum_size = thread_minimum_size
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+        
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        
+        pressure = self.load_monitor.pressure if self.load_monitor else PRESSURE_NORMAL
+        codec, levels = CODECS[encoding]
+        responder = _CompressionResponder(
+            send, encoding, codec, levels[pressure], self.minimum_size, self.thread_minimum_size
+        )
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """Per-response state: buffers the start message until the first body."""
+    
+    def __init__(
+        self,
+        send: Send,
+        encoding: str,
+        codec: type,
+        level: int,
+        minimum_size: int,
+        thread_minimum_size: int,
+    ):
+        self._send = send
+        self.encoding = encoding
+        self.codec = codec
+        self.level = level
+        self.minimum_size = minimum_size
+        self.thread_minimum_size = thread_minimum_size
+        
+        self.start_message: Optional[Message] = None
+        self.passthrough = False
+        self.started = False
+        self.compressor = None
+    
+    async def send(self, message: Message) -> None:
+        message_type = message["type"]
+        
+        if message_type == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            self.passthrough = (
+                "content-encoding" in headers
+                or message["status"] in (204, 206, 304)
+                or not is_compressible(headers.get("content-type", ""))
+            )
+            if self.passthrough:
+                await self._send(message)
+            else:
+                self.start_message = message
+            return
+        
+        if self.passthrough or message_type != "http.response.body":
+            if self.start_message is not None and not self.started:
+                self.started = True
+                await self._send(self.start_message)
+            await self._send(message)
+            return
+        
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        
+        if not self.started:
+            self.started = True
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers.add_vary_header("Accept-Encoding")
+            
+            if not more_body and len(body) < self.minimum_size:
+                # Small single-shot response: not worth the CPU
+                await self._send(self.start_message)
+                await self._send(message)
+                return
+            
+            headers["Content-Encoding"] = self.encoding
+            if more_body:
+                del headers["Content-Length"]
+            
+            self.compressor = self.codec(self.level)
+            if not more_body:
+                message["body"] = await self._compress_final(body)
+                headers["Content-Length"] = str(len(message["body"]))
+            else:
+                message["body"] = self.compressor.compress(body)
+            
+            await self._send(self.start_message)
+            await self._send(message)
+            return
+        
+        # Subsequent chunks of a streaming response
+        if more_body:
+            message["body"] = self.compressor.compress(body)
+        else:
+            message["body"] = self.compressor.finish(body)
+        await self._send(message)
+    
+    async def _compress_final(self, body: bytes) -> bytes:
+        """Compress a whole body, off the event loop when it is large."""
+        if len(body) >= self.thread_minimum_size:
+            return await asyncio.to_thread(self.compressor.finish, body)
+        return self.compressor.finish(body)
@@ -0,0 +1,202 @@
+"""
+Edge Middleware - Request ID, timing and rate limiting in a single ASGI pass
+"""
+
+import logging
+import time
+from typing import Callable, List, Optional, Protocol, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import (
+    REQUEST_LATENCY,
+    REQUESTS_IN_PROGRESS,
+    current_phase_timings,
+    finish_phase_timings,
+    format_server_timing,
+    record_phase,
+    route_template,
+    start_phase_timings,
+    timed_phase,
+)
+from app.core.rate_limiter import RateLimitResult
+from app.core.request_context import (
+    generate_request_id,
+    is_valid_request_id,
+    request_id_var,
+)
+from app.middleware.rate_limit import (
+    EXEMPT_PATHS,
+    get_client_id,
+    rate_limit_exceeded_response,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter(Protocol):
+    """Anything with the GCRARateLimiter / LeasedRateLimiter check signature."""
+    
+    async def check(
+        self,
+        client_id: str,
+        path: str = "/",
+        plan: Optional[str] = None,
+    ) -> RateLimitResult:
+        ...
+
+# Maps a bearer token to the caller's subscription plan (None if unknown)
+PlanResolver = Callable[[str], Optional[str]]
+
+REQUEST_ID_HEADER = b"x-request-id"
+AUTHORIZATION_HEADER = b"authorization"
+PROCESS_TIME_HEADER = b"x-process-time"
+SERVER_TIMING_HEADER = b"server-timing"
+
+
+class EdgeMiddleware:
+    """
+    Pure ASGI middleware combining RequestIDMiddleware, TimingMiddleware
+    and RateLimitMiddleware.
+    
+    Headers are injected by wrapping ``send`` instead of going through
+    BaseHTTPMiddleware, so no task is spawned per request and streaming
+    responses pass through untouched. Latency is recorded per route template
+    in Prometheus once the response has been fully sent.
+    """
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        rate_limiter: Optional[RateLimiter] = None,
+        plan_resolver: Optional[PlanResolver] = None,
+        server_timing: bool = False,
+    ) -> None:
+        """
+        Args:
+            app: Wrapped ASGI application
+            rate_limiter: Limiter to apply; None disables rate limiting
+            plan_resolver: Resolves the plan of callers sending a bearer
+                token, for per-plan rate limits; without it (or a token)
+                every caller is on the rules' default plan
+            server_timing: Add a Server-Timing header breaking each request
+                down into rate limit, app, DB and Redis time
+        """
+        self.app = app
+        self.rate_limiter = rate_limiter
+        self.plan_resolver = plan_resolver
+        self.server_timing = server_timing
+        self.api_key_header = settings.API_KEY_HEADER.lower().encode("latin-1")
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start_time = time.perf_counter()
+        method = scope["method"]
+        status_code = 500
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        timings_token = start_phase_timings()
+        
+        # Single scan over the raw headers for everything we need
+        request_id: Optional[str] = None
+        api_key: Optional[str] = None
+        bearer: Optional[str] = None
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER:
+                # Accept the caller's ID only if it is safe to echo and log
+                if is_valid_request_id(value):
+                    request_id = value.decode("latin-1")
+            elif name == self.api_key_header:
+                api_key = value.decode("latin-1")
+            elif name == AUTHORIZATION_HEADER and value[:7].lower() == b"bearer ":
+                bearer = value[7:].strip().decode("latin-1")
+        
+        # Not reset afterwards: the server runs each request in its own context,
+        # and the 500 handler (outside this middleware) still logs under this ID
+        request_id_var.set(request_id or generate_request_id())
+        
+        try:
+            status_code = await self._handle(scope, receive, send, start_time, api_key, bearer)
+        finally:
+            in_progress.dec()
+            finish_phase_timings(timings_token)
+            REQUEST_LATENCY.labels(route_template(scope), method, status_code).observe(
+                time.perf_counter() - start_time
+            )
+    
+    async def _handle(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        start_time: float,
+        api_key: Optional[str],
+        bearer: Optional[str],
+    ) -> int:
+        """Run the request and return the response status code."""
+        status_code = 500
+        request_id = request_id_var.get()
+        scope.setdefault("state", {})["request_id"] = request_id
+        
+        extra_headers: List[Tuple[bytes, bytes]] = [
+            (REQUEST_ID_HEADER, request_id.encode("latin-1"))
+        ]
+        app_start: Optional[float] = None
+        
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                now = time.perf_counter()
+                status_code = message["status"]
+                headers = list(message.get("headers", ()))
+                headers.extend(extra_headers)
+                headers.append((PROCESS_TIME_HEADER, f"{(now - start_time) * 1000:.2f}ms".encode("latin-1")))
+                if self.server_timing:
+                    if app_start is not None:
+                        record_phase("app", now - app_start)
+                    record_phase("total", now - start_time)
+                    headers.append((SERVER_TIMING_HEADER, format_server_timing(current_phase_timings())))
+                message["headers"] = headers
+            await send(message)
+        
+        # Skip rate limiting for health checks
+        if self.rate_limiter is not None and scope["path"] not in EXEMPT_PATHS:
+            client = scope.get("client")
+            client_id = get_client_id(api_key, client[0] if client else None)
+            
+            try:
+                with timed_phase("ratelimit"):
+                    plan = self._resolve_plan(bearer)
+                    scope["state"]["plan"] = plan
+                    result = await self.rate_limiter.check(client_id, scope["path"], plan)
+            except Exception as e:
+                logger.error(f"Rate limiting error: {str(e)}")
+                # Allow request on error (fail open)
+                result = None
+            
+            if result is not None and not result.allowed:
+                response = rate_limit_exceeded_response(result.limit, result.retry_after)
+                await response(scope, receive, send_wrapper)
+                return status_code
+            
+            if result is not None:
+                extra_headers.append((b"x-ratelimit-limit", str(result.limit).encode("latin-1")))
+                extra_headers.append((b"x-ratelimit-remaining", str(result.remaining).encode("latin-1")))
+        
+        app_start = time.perf_counter()
+        await self.app(scope, receive, send_wrapper)
+        return status_code
+    
+    def _resolve_plan(self, bearer: Optional[str]) -> Optional[str]:
+        if self.plan_resolver is None or not bearer:
+            return None
+        try:
+            return self.plan_resolver(bearer)
+        except Exception as e:
+            # An unreadable token only costs the caller its plan's higher limit
+            logger.warning(f"Plan resolution failed: {str(e)}")
+            return None
@@ -0,0 +1,118 @@
+"""
+Load Shedding Middleware - Adaptive concurrency limit with priority-aware 503s
+"""
+
+import time
+from typing import Optional, Sequence
+
+from starlette.responses import JSONResponse
+from starlette.status import HTTP_503_SERVICE_UNAVAILABLE
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.concurrency_limiter import (
+    PRIORITY_CRITICAL,
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    PRIORITY_NORMAL,
+    AdaptiveConcurrencyLimiter,
+)
+from app.middleware.rate_limit import EXEMPT_PATHS
+
+# Request header a client may use to mark its own traffic as low priority
+PRIORITY_HEADER = b"x-priority"
+
+
+def overloaded_response(retry_after: int = 1) -> JSONResponse:
+    """
+    Build the 503 response returned to shed requests.
+    
+    Args:
+        retry_after: Seconds until the client may retry
+    """
+    return JSONResponse(
+        status_code=HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "error": {
+                "code": 503,
+                "message": "Server is overloaded. Please try again later.",
+                "retry_after": retry_after
+            }
+        },
+        headers={"Retry-After": str(retry_after)}
+    )
+
+
+class LoadSheddingMiddleware:
+    """
+    Admit requests through an AdaptiveConcurrencyLimiter.
+    
+    Health probes (``/health``, ``/live``, ``/ready``) are always admitted.
+    Paths under ``high_priority_paths`` may use headroom above the learned
+    limit, while paths under ``low_priority_paths`` and requests sent with
+    ``X-Priority: low`` are shed first. Rejected requests get a 503 with
+    Retry-After before any handler work is done.
+    """
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+        high_priority_paths: Sequence[str] = (),
+        low_priority_paths: Sequence[str] = (),
+        retry_after: int = 1,
+    ) -> None:
+        self.app = app
+        self.limiter = limiter or AdaptiveConcurrencyLimiter()
+        self.high_priority_paths = tuple(high_priority_paths)
+        self.low_priority_paths = tuple(low_priority_paths)
+        self.retry_after = retry_after
+    
+    def _priority(self, scope: Scope) -> int:
+        path = scope["path"]
+        if path in EXEMPT_PATHS:
+            return PRIORITY_CRITICAL
+        if path.startswith(self.high_priority_paths):
+            return PRIORITY_HIGH
+        if path.startswith(self.low_priority_paths):
+            return PRIORITY_LOW
+        
+        for name, value in scope["headers"]:
+            if name == PRIORITY_HEADER and value.lower() == b"low":
+                return PRIORITY_LOW
+        
+        return PRIORITY_NORMAL
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        priority = self._priority(scope)
+        # Health probe latency and failures say nothing about the API's
+        sample = priority != PRIORITY_CRITICAL
+        if not self.limiter.try_acquire(priority):
+            await overloaded_response(self.retry_after)(scope, receive, send)
+            return
+        
+        start_time = time.perf_counter()
+        status_code = 0
+        failed = False
+        
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            # A client disconnect (cancellation) is not a congestion signal
+            self.limiter.release(
+                time.perf_counter() - start_time,
+                failed=sample and (failed or status_code >= 500),
+                sample=sample,
+            )
@@ -0,0 +1,259 @@
+"""
+Response Cache Middleware - Serves cached GET responses with strong ETags
+"""
+
+import hashlib
+import json
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache import TwoTierCache
+from app.core.config import settings
+from app.middleware.compression import negotiate_encoding
+
+RawHeaders = List[Tuple[bytes, bytes]]
+
+
+class CacheRule(NamedTuple):
+    """
+    Cache policy for a path.
+    
+    Attributes:
+        path: Path the rule applies to
+        ttl: Seconds a response stays cached
+        namespace: Invalidation group, e.g. "agents"
+        prefix: Match every path below ``path`` instead of ``path`` only
+        shared: Response is identical for every caller (skip auth in the key)
+    """
+    path: str
+    ttl: float
+    namespace: str
+    prefix: bool = False
+    shared: bool = False
+
+
+class CachedResponse(NamedTuple):
+    status: int
+    headers: RawHeaders
+    body: bytes
+    etag: bytes
+
+
+def encode_response(response: CachedResponse) -> bytes:
+    """Serialise a cached response for the Redis tier."""
+    meta = {
+        "status": response.status,
+        "headers": [[k.decode("latin-1"), v.decode("latin-1")] for k, v in response.headers],
+        "etag": response.etag.decode("latin-1"),
+    }
+    return json.dumps(meta).encode() + b"\n" + response.body
+
+
+def decode_response(data: bytes) -> CachedResponse:
+    """Inverse of encode_response."""
+    meta, _, body = data.partition(b"\n")
+    meta = json.loads(meta)
+    return CachedResponse(
+        meta["status"],
+        [(k.encode("latin-1"), v.encode("latin-1")) for k, v in meta["headers"]],
+        body,
+        meta["etag"].encode("latin-1"),
+    )
+
+
+def make_etag(body: bytes) -> bytes:
+    """Strong ETag for a response body."""
+    return b'"' + hashlib.blake2b(body, digest_size=16).hexdigest().encode() + b'"'
+
+
+def etag_matches(if_none_match: str, etag: bytes) -> bool:
+    """
+    Evaluate If-None-Match against an ETag (weak comparison, RFC 9110).
+    """
+    if if_none_match.strip() == "*":
+        return True
+    
+    opaque = etag.decode("latin-1")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    
+    return False
+
+
+# Headers that make a response unsafe to share or that must not be replayed
+UNCACHEABLE_HEADERS = frozenset({b"set-cookie"})
+
+
+class ResponseCacheMiddleware:
+    """
+    Cache serialized GET responses and answer conditional requests.
+    
+    Entries are keyed by path, query string, negotiated Content-Encoding,
+    Origin and (unless the rule is ``shared``) a hash of the caller's
+    credentials: Authorization, API key and Cookie headers. Hits
+    are replayed without running the handler, and a matching If-None-Match
+    gets a bodyless 304. Only complete 200 responses without Set-Cookie or
+    ``Cache-Control: no-store/private`` are stored; streaming responses pass
+    through untouched.
+    
+    Place it outside CompressionMiddleware so compressed bytes are cached
+    and hits cost no CPU. Invalidate with ``cache.invalidate(namespace)``
+    after writes.
+    """
+    
+    def __init__(self, app: ASGIApp, cache: TwoTierCache, rules: Sequence[CacheRule]) -> None:
+        self.app = app
+        self.cache = cache
+        self.exact = {rule.path: rule for rule in rules if not rule.prefix}
+        self.prefixes = sorted(
+            (rule for rule in rules if rule.prefix),
+            key=lambda rule: len(rule.path),
+            reverse=True,
+        )
+        self.api_key_header = settings.API_KEY_HEADER.lower()
+    
+    def _match(self, path: str) -> Optional[CacheRule]:
+        rule = self.exact.get(path)
+        if rule is not None:
+            return rule
+        
+        for rule in self.prefixes:
+            if path == rule.path or path.startswith(rule.path.rstrip("/") + "/"):
+                return rule
+        
+        return None
+    
+    def _cache_key(self, scope: Scope, headers: Headers, rule: CacheRule) -> str:
+        parts = [
+            scope["path"],
+            scope["query_string"].decode("latin-1"),
+            negotiate_encoding(headers.get("accept-encoding", "")) or "identity",
+            # CORS headers added further in depend on the caller's origin
+            headers.get("origin", ""),
+        ]
+        if not rule.shared:
+            parts.append(headers.get("authorization", ""))
+            parts.append(headers.get(self.api_key_header, ""))
+            # Session-cookie callers must never share entries
+            parts.append(headers.get("cookie", ""))
+        
+        # Hash so credentials never appear in cache keys
+        return hashlib.blake2b("\n".join(parts).encode(), digest_size=16).hexdigest()
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+        
+        rule = self._match(scope["path"])
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+        
+        headers = Headers(scope=scope)
+        if "no-cache" in headers.get("cache-control", ""):
+            await self.app(scope, receive, send)
+            return
+        
+        key = self._cache_key(scope, headers, rule)
+        if_none_match = headers.get("if-none-match")
+        
+        cached = await self.cache.get(rule.namespace, key)
+        if cached is not None:
+            await self._replay(cached, scope, send, if_none_match, b"HIT")
+            return
+        
+        await self._fill(scope, receive, send, rule, key, if_none_match)
+    
+    async def _replay(
+        self,
+        cached: CachedResponse,
+        scope: Scope,
+        send: Send,
+        if_none_match: Optional[str],
+        cache_status: bytes,
+    ) -> None:
+        headers = cached.headers + [(b"etag", cached.etag), (b"x-cache", cache_status)]
+        
+        if if_none_match and etag_matches(if_none_match, cached.etag):
+            headers = [
+                (name, value) for name, value in headers
+                if name not in (b"content-length", b"content-type")
+            ]
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        
+        body = b"" if scope["method"] == "HEAD" else cached.body
+        await send({"type": "http.response.start", "status": cached.status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+    
+    async def _fill(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        rule: CacheRule,
+        key: str,
+        if_none_match: Optional[str],
+    ) -> None:
+        """Run the handler, caching and conditionally answering its response."""
+        start_message: Optional[Message] = None
+        cacheable = False
+        passthrough = False
+        
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, cacheable, passthrough
+            
+            if passthrough:
+                await send(message)
+                return
+            
+            if message["type"] == "http.response.start":
+                start_message = message
+                response_headers = Headers(raw=message["headers"])
+                cache_control = response_headers.get("cache-control", "")
+                cacheable = (
+                    message["status"] == 200
+                    and scope["method"] == "GET"
+                    and "no-store" not in cache_control
+                    and "private" not in cache_control
+                    and not any(name in UNCACHEABLE_HEADERS for name, _ in message["headers"])
+                )
+                return
+            
+            if message["type"] != "http.response.body" or message.get("more_body", False) or not cacheable:
+                # Streaming or uncacheable: forward as is from here on
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+            
+            body = message.get("body", b"")
+            cached = CachedResponse(
+                start_message["status"],
+                [(name, value) for name, value in start_message["headers"] if name != b"etag"],
+                body,
+                make_etag(body),
+            )
+            await self.cache.set(rule.namespace, key, cached, rule.ttl)
+            await self._replay(cached, scope, send, if_none_match, b"MISS")
+        
+        await self.app(scope, receive, send_wrapper)
+
+
+# Shared response cache. Write paths call
+# ``await response_cache.invalidate("agents")`` to drop stale entries.
+response_cache = TwoTierCache(
+    "http",
+    maxsize=2048,
+    redis_tier=True,
+    encode=encode_response,
+    decode=decode_response,
+)
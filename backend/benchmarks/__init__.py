@@ -0,0 +1,3 @@
+"""
+LUXORANOVA Benchmarks
+"""
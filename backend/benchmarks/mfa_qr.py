@@ -0,0 +1,80 @@
+"""
+MFA QR Benchmark - PNG vs SVG enrollment QR codes
+
+Compares payload size (raw and gzip, as sent through CompressionMiddleware)
+and render time of the two formats, then the cost of
+a cached call to generate_mfa_qr_code_async (an enrollment page reload).
+
+Usage (from backend/):
+    python -m benchmarks.mfa_qr --iterations 200
+"""
+
+import argparse
+import asyncio
+import gzip
+import statistics
+import time
+from typing import List
+
+from app.core.security import (
+    generate_mfa_qr_code,
+    generate_mfa_qr_code_async,
+    generate_mfa_secret,
+)
+
+EMAIL = "benchmark.user@example.com"
+
+
+def bench_render(image_format: str, iterations: int) -> List[float]:
+    """Render a fresh secret each time; returns per-call seconds."""
+    timings = []
+    for _ in range(iterations):
+        secret = generate_mfa_secret()
+        start = time.perf_counter()
+        generate_mfa_qr_code(secret, EMAIL, image_format)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def bench_cached(image_format: str, iterations: int) -> List[float]:
+    """Repeat calls for one secret after the first render."""
+    secret = generate_mfa_secret()
+    await generate_mfa_qr_code_async(secret, EMAIL, image_format)
+    
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await generate_mfa_qr_code_async(secret, EMAIL, image_format)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(label: str, timings: List[float]) -> None:
+    timings = sorted(timings)
+    p50 = statistics.median(timings) * 1e3
+    p99 = timings[int(len(timings) * 0.99) - 1] * 1e3
+    print(f"{label:<14} p50 {p50:8.3f} ms   p99 {p99:8.3f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    
+    secret = generate_mfa_secret()
+    for image_format in ("png", "svg"):
+        data_uri = generate_mfa_qr_code(secret, EMAIL, image_format).encode()
+        print(
+            f"{image_format} data URI size: {len(data_uri)} bytes "
+            f"({len(gzip.compress(data_uri))} gzipped)"
+        )
+    print()
+    
+    for image_format in ("png", "svg"):
+        report(f"{image_format} render", bench_render(image_format, args.iterations))
+    for image_format in ("png", "svg"):
+        report(f"{image_format} cached", asyncio.run(bench_cached(image_format, args.iterations)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Middleware Microbenchmark - EdgeMiddleware vs the BaseHTTPMiddleware stack
+
+Drives both stacks directly over ASGI (no server, no network) so the numbers
+only reflect middleware overhead. Redis is replaced by a constant rate limit
+check to keep the comparison about the middleware itself.
+
+Usage (from backend/):
+    python -m benchmarks.middleware_stack --requests 20000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Callable, List
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.rate_limiter import RateLimitResult
+from app.middleware.edge import EdgeMiddleware
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.request_id import RequestIDMiddleware
+from app.middleware.timing import TimingMiddleware
+
+BODY = b'{"status": "ok"}'
+
+
+async def endpoint(scope: Scope, receive: Receive, send: Send) -> None:
+    """Minimal JSON endpoint."""
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(BODY)).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": BODY})
+
+
+class AllowAll:
+    """Rate limiter without Redis."""
+    
+    async def check(self, client_id: str, path: str = "/", plan=None) -> RateLimitResult:
+        return RateLimitResult(True, 60, 59, 0.0)
+
+
+class LocalRateLimitMiddleware(RateLimitMiddleware):
+    """RateLimitMiddleware with the Redis round trip removed."""
+    
+    async def _check_rate_limit(self, client_id: str) -> tuple[bool, int]:
+        return True, 59
+
+
+def build_legacy_stack() -> ASGIApp:
+    """Same order main.py used: RateLimit -> Timing -> RequestID -> app."""
+    return LocalRateLimitMiddleware(TimingMiddleware(RequestIDMiddleware(endpoint)))
+
+
+def build_edge_stack() -> ASGIApp:
+    return EdgeMiddleware(endpoint, rate_limiter=AllowAll())
+
+
+def make_scope() -> Scope:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/api/v1/",
+        "raw_path": b"/api/v1/",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"testserver"), (b"accept", b"application/json")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+
+
+async def one_request(app: ASGIApp) -> float:
+    """Run a single request through app and return its latency in seconds."""
+    body_sent = False
+    disconnected = asyncio.Event()
+    
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Like a real server, block until the client goes away
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+    
+    async def send(message):
+        pass
+    
+    start = time.perf_counter()
+    await app(make_scope(), receive, send)
+    return time.perf_counter() - start
+
+
+async def run(app: ASGIApp, requests: int, concurrency: int) -> dict:
+    latencies: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def worker():
+        async with semaphore:
+            latencies.append(await one_request(app))
+    
+    # Warm up
+    for _ in range(min(500, requests)):
+        await one_request(app)
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "mean_us": statistics.fmean(latencies) * 1e6,
+        "p50_us": latencies[len(latencies) // 2] * 1e6,
+        "p99_us": latencies[int(len(latencies) * 0.99) - 1] * 1e6,
+    }
+
+
+def report(name: str, result: dict) -> None:
+    print(
+        f"{name:<10} {result['rps']:>10.0f} req/s  "
+        f"mean {result['mean_us']:>8.1f}us  "
+        f"p50 {result['p50_us']:>8.1f}us  "
+        f"p99 {result['p99_us']:>8.1f}us"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    
+    stacks: List[tuple[str, Callable[[], ASGIApp]]] = [
+        ("legacy", build_legacy_stack),
+        ("edge", build_edge_stack),
+    ]
+    results = {}
+    for name, build in stacks:
+        results[name] = asyncio.run(run(build(), args.requests, args.concurrency))
+        report(name, results[name])
+    
+    speedup = results["edge"]["rps"] / results["legacy"]["rps"]
+    print(f"\nEdgeMiddleware throughput: {speedup:.2f}x legacy stack")
+
+
+if __name__ == "__main__":
+    main()
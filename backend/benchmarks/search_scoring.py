@@ -0,0 +1,131 @@
+"""
+Search Scoring Benchmark - ai_focused_search relevance scoring throughput
+
+Ranks synthetic SearXNG result pages with the original per-keyword loop
+and full sort, then with KeywordScorer and heap top-k selection: the AI
+keyword set, the same with a heavier title weight, and a large keyword
+set with substring checks and (when pyahocorasick is installed) an
+Aho-Corasick automaton. Scores are checked against the original loop
+before timing.
+
+Usage (from backend/):
+    python -m benchmarks.search_scoring --results 1000 10000
+"""
+
+import argparse
+import random
+import statistics
+import string
+import time
+from typing import Any, Callable, Dict, List
+
+from services.search import scoring
+from services.search.scoring import AI_KEYWORDS, KeywordScorer, top_k
+
+GENERAL_WORDS = (
+    "the of and to in for with on is this that how from by about guide best new "
+    "your what are can use open source project data model library framework "
+    "tutorial documentation example release update server web search results page "
+    "news video image system performance install configure version support "
+    "community blog training detail maintain paint rapid explain certain domain"
+).split()
+
+TOPICAL_WORDS = [
+    "AI", "machine learning", "neural network", "deep learning", "Python",
+    "TensorFlow", "PyTorch", "GitHub", "API",
+]
+
+
+def make_results(count: int, seed: int = 7) -> List[Dict[str, Any]]:
+    """Result pages where roughly one word in thirty is on-topic."""
+    rng = random.Random(seed)
+    
+    def words(k: int) -> str:
+        return " ".join(
+            rng.choice(TOPICAL_WORDS) if rng.random() < 0.03 else rng.choice(GENERAL_WORDS)
+            for _ in range(k)
+        )
+    
+    return [
+        {"title": words(8).title(), "content": words(40), "url": f"https://example.com/{i}"}
+        for i in range(count)
+    ]
+
+
+def original(results: List[Dict[str, Any]], limit: int = 10) -> List[Dict[str, Any]]:
+    """The scoring loop ai_focused_search used before KeywordScorer."""
+    filtered = []
+    for result in results:
+        title = result.get('title', '').lower()
+        content = result.get('content', '').lower()
+        score = sum(1 for keyword in AI_KEYWORDS if keyword in title or keyword in content)
+        if score > 0:
+            filtered.append((score, result))
+    filtered.sort(key=lambda pair: pair[0], reverse=True)
+    return filtered[:limit]
+
+
+def ranker(scorer: KeywordScorer) -> Callable[[List[Dict[str, Any]]], Any]:
+    def rank(results: List[Dict[str, Any]], limit: int = 10):
+        return top_k(results, scorer.score(results), limit)
+    return rank
+
+
+def bench(rank: Callable, results: List[Dict[str, Any]], repeat: int) -> float:
+    """Median seconds to rank the whole batch."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rank(results)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--results", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--keywords", type=int, default=200, help="size of the large keyword set")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    
+    rng = random.Random(1)
+    large_set = AI_KEYWORDS + [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10)))
+        for _ in range(args.keywords - len(AI_KEYWORDS))
+    ]
+    
+    ai_scorer = KeywordScorer(AI_KEYWORDS)
+    candidates = {
+        "original": original,
+        "scorer": ranker(ai_scorer),
+        "scorer, title x2": ranker(KeywordScorer(AI_KEYWORDS, {"title": 2.0, "content": 1.0})),
+        f"{args.keywords} keywords": ranker(KeywordScorer(large_set, use_automaton=False)),
+    }
+    if scoring.ahocorasick is not None:
+        candidates[f"{args.keywords} keywords, automaton"] = ranker(KeywordScorer(large_set, use_automaton=True))
+    else:
+        print("pyahocorasick not installed; skipping the automaton\n")
+    
+    for count in args.results:
+        results = make_results(count)
+        
+        expected = [
+            sum(1 for keyword in AI_KEYWORDS if keyword in r['title'].lower() or keyword in r['content'].lower())
+            for r in results
+        ]
+        assert ai_scorer.score(results) == expected, "scores differ from the original loop"
+        assert [r for _, r in ranker(ai_scorer)(results)] == [r for _, r in original(results)]
+        
+        baseline = None
+        for name, rank in candidates.items():
+            seconds = bench(rank, results, args.repeat)
+            baseline = baseline or seconds
+            print(
+                f"{count:>7} results  {name:<28} {count / seconds:>12,.0f} results/s  "
+                f"{seconds * 1e3:>9.2f} ms  {baseline / seconds:>5.2f}x"
+            )
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Security Benchmark - Auth hot-path functions under concurrency, with regression gates
+
+Runs each function from many concurrent coroutines on one event loop, the
+way request handlers call them, and records per-call latency together with
+how long the event loop was blocked (the scheduling delay of a 1 ms ticker:
+what every other request on the worker waits). Results are written as JSON;
+given a baseline from an earlier run, the benchmark exits non-zero when a
+function's p50 latency or p99 loop stall grows past the threshold.
+
+Usage (from backend/):
+    python -m benchmarks.security --output security.json
+    python -m benchmarks.security --baseline security.json --threshold 1.5
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, NamedTuple
+
+import pyotp
+
+from app.core import security
+from app.core.config import settings
+from app.core.password_hashing import password_hasher
+
+LAG_INTERVAL = 0.001
+
+# Loop stalls below this are scheduler noise, not regressions
+LAG_FLOOR_MS = 1.0
+
+
+class Case(NamedTuple):
+    """One benchmarked call; func may return an awaitable."""
+    name: str
+    func: Callable[[], Any]
+    concurrency: int
+
+
+def build_cases(concurrency: int) -> List[Case]:
+    password = "correct horse battery staple"
+    password_hash = security.hash_password(password)
+    access_token = security.create_access_token({"sub": "benchmark-user"})
+    api_key, _ = security.generate_api_key()
+    api_key_hash = security.hash_api_key(api_key)
+    mfa_secret = security.generate_mfa_secret()
+    mfa_code = pyotp.TOTP(mfa_secret).now()
+    
+    def decode_token_uncached():
+        security._claims_cache.clear()
+        return security.decode_token(access_token, "access")
+    
+    # bcrypt calls are ~100x slower; fewer callers keep run time reasonable
+    slow = max(1, concurrency // 10)
+    # Stay within the hashing pool's admission limit rather than measure rejections
+    pooled = min(slow, password_hasher.max_pending)
+    return [
+        Case("hash_password", lambda: security.hash_password(password), slow),
+        Case("verify_password", lambda: security.verify_password(password, password_hash), slow),
+        Case("hash_password_async", lambda: security.hash_password_async(password), pooled),
+        Case(
+            "verify_password_async",
+            lambda: security.verify_password_async(password, password_hash),
+            pooled,
+        ),
+        Case("create_access_token", lambda: security.create_access_token({"sub": "benchmark-user"}), concurrency),
+        Case("decode_token", lambda: security.decode_token(access_token, "access"), concurrency),
+        Case("decode_token_uncached", decode_token_uncached, concurrency),
+        Case("verify_api_key", lambda: security.verify_api_key(api_key, api_key_hash), concurrency),
+        Case("verify_mfa_code", lambda: security.verify_mfa_code(mfa_secret, mfa_code), concurrency),
+    ]
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def run_case(case: Case, seconds: float, min_calls: int) -> Dict[str, float]:
+    latencies: List[float] = []
+    lags: List[float] = []
+    running = True
+    
+    async def ticker():
+        while running:
+            start = time.perf_counter()
+            await asyncio.sleep(LAG_INTERVAL)
+            lags.append(max(0.0, time.perf_counter() - start - LAG_INTERVAL))
+    
+    async def worker(deadline: float):
+        while time.perf_counter() < deadline or len(latencies) < min_calls:
+            start = time.perf_counter()
+            result = case.func()
+            if inspect.isawaitable(result):
+                await result
+            latencies.append(time.perf_counter() - start)
+            # Request boundary: let other coroutines run
+            await asyncio.sleep(0)
+    
+    # Warm up
+    for _ in range(3):
+        result = case.func()
+        if inspect.isawaitable(result):
+            await result
+    
+    monitor = asyncio.create_task(ticker())
+    await asyncio.sleep(LAG_INTERVAL)
+    start = time.perf_counter()
+    deadline = start + seconds
+    await asyncio.gather(*(worker(deadline) for _ in range(case.concurrency)))
+    elapsed = time.perf_counter() - start
+    running = False
+    await monitor
+    
+    latencies.sort()
+    lags.sort()
+    return {
+        "calls": len(latencies),
+        "concurrency": case.concurrency,
+        "ops_per_sec": len(latencies) / elapsed,
+        "mean_us": statistics.fmean(latencies) * 1e6,
+        "p50_us": percentile(latencies, 0.50) * 1e6,
+        "p99_us": percentile(latencies, 0.99) * 1e6,
+        "loop_blocked_pct": min(100.0, sum(lags) / elapsed * 100),
+        "loop_lag_p99_ms": percentile(lags, 0.99) * 1e3 if lags else 0.0,
+        "loop_lag_max_ms": lags[-1] * 1e3 if lags else elapsed * 1e3,
+    }
+
+
+def find_regressions(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float,
+) -> List[str]:
+    """Describe every function whose p50 latency or p99 loop stall regressed."""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        
+        if result["p50_us"] > previous["p50_us"] * threshold:
+            regressions.append(
+                f"{name}: p50 {result['p50_us']:.1f}us vs baseline {previous['p50_us']:.1f}us"
+            )
+        
+        # p99 rather than max: single stalls are dominated by GC and scheduling
+        allowed_lag = max(previous["loop_lag_p99_ms"], LAG_FLOOR_MS) * threshold
+        if result["loop_lag_p99_ms"] > allowed_lag:
+            regressions.append(
+                f"{name}: p99 loop stall {result['loop_lag_p99_ms']:.2f}ms vs baseline "
+                f"{previous['loop_lag_p99_ms']:.2f}ms"
+            )
+    return regressions
+
+
+def report(name: str, result: Dict[str, float]) -> None:
+    print(
+        f"{name:<24} {result['ops_per_sec']:>10.0f} ops/s  "
+        f"p50 {result['p50_us']:>10.1f}us  "
+        f"p99 {result['p99_us']:>10.1f}us  "
+        f"loop blocked {result['loop_blocked_pct']:>5.1f}%  "
+        f"stall p99 {result['loop_lag_p99_ms']:>8.2f}ms max {result['loop_lag_max_ms']:>8.2f}ms"
+    )
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    await password_hasher.start()
+    try:
+        results = {}
+        for case in build_cases(args.concurrency):
+            if args.only and case.name not in args.only:
+                continue
+            results[case.name] = await run_case(case, args.seconds, args.min_calls)
+            report(case.name, results[case.name])
+        return results
+    finally:
+        await password_hasher.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=2.0, help="time per function")
+    parser.add_argument("--min-calls", type=int, default=20, help="calls per function at least")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--only", nargs="*", help="benchmark only these functions")
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=1.5, help="allowed slowdown ratio")
+    args = parser.parse_args()
+    
+    results = asyncio.run(run(args))
+    
+    if args.output:
+        document = {
+            "meta": {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "jwt_algorithm": settings.JWT_ALGORITHM,
+                "seconds": args.seconds,
+                "concurrency": args.concurrency,
+            },
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+    
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        
+        regressions = find_regressions(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nRegressions beyond {args.threshold}x baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.threshold}x baseline")
+
+
+if __name__ == "__main__":
+    main()
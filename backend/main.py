@@ -8,27 +8,47 @@ from typing import AsyncGenerator
 
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from prometheus_client import make_asgi_app
 import uvicorn
 
+from app.core.api_keys import api_key_authenticator
 from app.core.config import settings
 from app.core.database import engine, Base
+from app.core.jwt_keys import ASYMMETRIC_ALGORITHMS, JWKS_MAX_AGE, jwt_keyring
 from app.core.redis_client import redis_client
 from app.core.logging_config import setup_logging
+from app.core.load_monitor import LoadMonitor
+from app.core.metrics import instrument_engine
+from app.core.password_hashing import PasswordHasherBusy, password_hasher
+from app.core.sessions import session_store
+from app.core.request_context import REQUEST_ID_HEADER, install_log_record_factory, tag_sql_statements
+from app.core.rate_limiter import build_rate_limiter
+from app.core.security import get_token_plan
+from app.core.token_revocation import token_revocations
 from app.api.v1 import api_router
-from app.middleware.rate_limit import RateLimitMiddleware
-from app.middleware.request_id import RequestIDMiddleware
-from app.middleware.timing import TimingMiddleware
+from app.middleware.coalescing import CoalescingMiddleware
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.edge import EdgeMiddleware
+from app.middleware.load_shedding import LoadSheddingMiddleware, overloaded_response
+from app.middleware.response_cache import CacheRule, ResponseCacheMiddleware, response_cache
+from services.search.searxng_service import searxng_http
 
 # Setup logging
 setup_logging()
+install_log_record_factory()
 logger = logging.getLogger(__name__)
 
+# Rate limiter chosen by RATE_LIMITER: "gcra" (route and plan aware rules,
+# resolved once here at startup) or "leased" (no Redis on the hot path)
+rate_limiter = build_rate_limiter()
+
+# Event loop lag / CPU sampling used to shed optional work under load
+load_monitor = LoadMonitor()
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator:
@@ -48,8 +68,19 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
         # Initialize Redis
         logger.info("🔴 Connecting to Redis...")
         await redis_client.ping()
+        await rate_limiter.start()
         logger.info("✅ Redis connected successfully")
         
+        await load_monitor.start()
+        await response_cache.start()
+        await api_key_authenticator.start()
+        await token_revocations.start()
+        await password_hasher.start()
+        if settings.JWT_ALGORITHM in ASYMMETRIC_ALGORITHMS:
+            await jwt_keyring.start()
+        await session_store.start()
+        await searxng_http.start()
+        
         # Initialize AI models
         logger.info("🤖 Loading AI models...")
         # TODO: Initialize Ollama, OpenAI, etc.
@@ -72,7 +103,17 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
     logger.info("🛑 Shutting down LUXORANOVA...")
     
     try:
-        # Close Redis connection
+        await load_monitor.stop()
+        await response_cache.stop()
+        await api_key_authenticator.stop()
+        await token_revocations.stop()
+        await password_hasher.stop()
+        await jwt_keyring.stop()
+        await session_store.stop()
+        await searxng_http.stop()
+        
+        # Flush rate limit usage and close Redis connection
+        await rate_limiter.stop()
         await redis_client.close()
         logger.info("✅ Redis connection closed")
         
@@ -109,11 +150,40 @@ app.add_middleware(
     allow_credentials=settings.CORS_ALLOW_CREDENTIALS,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["X-Request-ID", "X-Process-Time"],
+    expose_headers=["X-Request-ID", "X-Process-Time", "Retry-After"],
 )
 
-# Gzip Compression
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+# Response Compression (zstd/brotli/gzip, cheaper levels under load)
+app.add_middleware(CompressionMiddleware, minimum_size=1000, load_monitor=load_monitor)
+
+# Request Coalescing (concurrent identical GETs share one handler run)
+app.add_middleware(
+    CoalescingMiddleware,
+    paths=["/api/v1/agents", "/api/v1/tasks", "/api/v1/workflows"],
+)
+
+# Load Shedding (adaptive in-flight limit; health probes always admitted;
+# inside the response cache so hits are never shed)
+app.add_middleware(
+    LoadSheddingMiddleware,
+    high_priority_paths=("/api/v1/auth",),
+    low_priority_paths=tuple(
+        path for path in (app.docs_url, app.redoc_url, app.openapi_url) if path
+    ),
+)
+
+# Response Cache (outside compression so hits replay compressed bytes)
+app.add_middleware(
+    ResponseCacheMiddleware,
+    cache=response_cache,
+    rules=[
+        CacheRule("/", ttl=300, namespace="meta", shared=True),
+        CacheRule("/api/v1/", ttl=300, namespace="meta", shared=True),
+        CacheRule("/api/v1/agents", ttl=5, namespace="agents", prefix=True),
+        CacheRule("/api/v1/tasks", ttl=5, namespace="tasks", prefix=True),
+        CacheRule("/api/v1/workflows", ttl=5, namespace="workflows", prefix=True),
+    ],
+)
 
 # Trusted Host (Production only)
 if settings.APP_ENV == "production":
@@ -122,10 +192,20 @@ if settings.APP_ENV == "production":
         allowed_hosts=settings.ALLOWED_HOSTS,
     )
 
-# Custom Middleware
-app.add_middleware(RequestIDMiddleware)
-app.add_middleware(TimingMiddleware)
-app.add_middleware(RateLimitMiddleware)
+# Request ID, timing, metrics and rate limiting (single pure ASGI pass)
+app.add_middleware(
+    EdgeMiddleware,
+    rate_limiter=rate_limiter,
+    plan_resolver=get_token_plan,
+    server_timing=settings.APP_ENV != "production",
+)
+
+# Attribute SQL time to the request that issued it (Server-Timing "db")
+instrument_engine(engine)
+
+# Tag SQL with the request ID (off in production: it defeats statement caching)
+if settings.APP_ENV != "production":
+    tag_sql_statements(engine)
 
 
 # ============================================================================
@@ -163,6 +243,12 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     )
 
 
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    """Handle a saturated hashing pool (password or legacy API key checks) as overload, not a 500."""
+    return overloaded_response()
+
+
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     """Handle general exceptions."""
@@ -176,6 +262,8 @@ async def general_exception_handler(request: Request, exc: Exception):
                 "request_id": request.state.request_id,
             }
         },
+        # Sent from outside EdgeMiddleware, which adds the header to other responses
+        headers={REQUEST_ID_HEADER: request.state.request_id},
     )
 
 
@@ -253,6 +341,25 @@ async def root():
     }
 
 
+# Public signing keys for verifying access tokens locally (RFC 7517)
+@app.get("/.well-known/jwks.json", tags=["Auth"])
+async def jwks(request: Request):
+    """
+    JSON Web Key Set of the token signing keys.
+    
+    Includes keys not yet used for signing, so verifiers that honour the
+    cache lifetime always know a key before it appears in a token.
+    """
+    headers = {
+        "Cache-Control": f"public, max-age={JWKS_MAX_AGE}",
+        "ETag": jwt_keyring.jwks_etag,
+    }
+    if request.headers.get("if-none-match") == jwt_keyring.jwks_etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    return Response(jwt_keyring.jwks_json, media_type="application/json", headers=headers)
+
+
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
@@ -0,0 +1,188 @@
+"""
+SearXNG Response Decoding
+Fast JSON decoding (orjson when installed) and incremental result streaming
+"""
+
+import asyncio
+import codecs
+import json
+import re
+from typing import Any, Dict, List, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+# Bodies larger than this are decoded in a worker thread, off the event loop
+OFFLOAD_THRESHOLD = 256 * 1024
+
+# Before the results: a complete string, a lone quote (string not fully received yet) or structure
+_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|"|[{}\[\],:]', re.DOTALL)
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+# What may follow an entry; numbers and literals never contain it
+_ENTRY_END = re.compile(r'[,\]]')
+
+_raw_decode = json.JSONDecoder().raw_decode
+
+_HEAD, _RESULTS, _TAIL = range(3)
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode JSON with orjson if available, else the standard library."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+async def decode_page(body: bytes) -> Any:
+    """Decode a response body, in a thread if it is large enough to stall the loop."""
+    if len(body) >= OFFLOAD_THRESHOLD:
+        return await asyncio.to_thread(loads, body)
+    return loads(body)
+
+
+class ResultStreamDecoder:
+    """
+    Decodes a SearXNG JSON page as it arrives.
+    
+    ``feed`` returns the entries of the top-level ``results`` array completed
+    by each chunk, so they can be used before the rest of the page has been
+    received. Each entry is decoded once, by the standard library's C
+    scanner, and its text is then dropped; ``close`` decodes the rest of the
+    page and returns it whole.
+    """
+    
+    def __init__(self):
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._state = _HEAD
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._key: Optional[str] = None
+        self._awaiting_results = False
+        self._after_item = False
+        self._head = ""
+        self._items: List[Dict[str, Any]] = []
+    
+    def feed(self, chunk: bytes) -> List[Dict[str, Any]]:
+        """
+        Add received bytes.
+        
+        Returns:
+            Result entries completed by this chunk, in page order
+        
+        Raises:
+            ValueError: If the results array is malformed
+        """
+        self._text += self._utf8.decode(chunk)
+        if self._state == _HEAD:
+            self._scan_head()
+        if self._state != _RESULTS:
+            return []
+        
+        completed = self._scan_results()
+        self._items.extend(completed)
+        return completed
+    
+    def close(self) -> Dict[str, Any]:
+        """
+        Finish decoding.
+        
+        Returns:
+            The full page, reusing the already decoded result entries
+        
+        Raises:
+            ValueError: If the page is incomplete or not valid JSON
+        """
+        self._text += self._utf8.decode(b"", final=True)
+        if self._state == _HEAD:
+            return loads(self._text)
+        if self._state == _RESULTS:
+            raise ValueError("Incomplete SearXNG response")
+        
+        page = loads(self._head + "[]" + self._text)
+        page["results"] = self._items
+        return page
+    
+    def _scan_head(self) -> None:
+        """Find the start of the top-level results array."""
+        text = self._text
+        while True:
+            match = _TOKEN.search(text, self._pos)
+            if match is None:
+                self._pos = len(text)
+                return
+            
+            token = match.group()
+            if token == '"':
+                # Wait for the rest of the string
+                self._pos = match.start()
+                return
+            self._pos = match.end()
+            
+            if token[0] == '"':
+                if self._depth == 1:
+                    self._key = token
+                continue
+            
+            if token == ":":
+                self._awaiting_results = self._depth == 1 and self._key == '"results"'
+                continue
+            
+            if token == "[" and self._awaiting_results:
+                self._state = _RESULTS
+                self._head = text[:match.start()]
+                self._text = text[match.end():]
+                self._pos = 0
+                return
+            
+            self._awaiting_results = False
+            if token in ("{", "["):
+                self._depth += 1
+            elif token in ("}", "]"):
+                self._depth -= 1
+    
+    def _scan_results(self) -> List[Dict[str, Any]]:
+        """Decode complete result entries, keeping only unconsumed text."""
+        text = self._text
+        pos = self._pos
+        completed = []
+        while True:
+            pos = _WHITESPACE.match(text, pos).end()
+            if pos == len(text):
+                break
+            
+            if text[pos] == "]":
+                self._state = _TAIL
+                self._text = text[pos + 1:]
+                self._pos = 0
+                return completed
+            
+            if self._after_item:
+                if text[pos] != ",":
+                    raise ValueError("Malformed SearXNG results")
+                self._after_item = False
+                pos += 1
+                continue
+            
+            scalar = text[pos] not in '{["'
+            if scalar and _ENTRY_END.search(text, pos) is None:
+                # A number or literal may continue in the next chunk ("3." of "3.5")
+                break
+            
+            try:
+                item, end = _raw_decode(text, pos)
+            except json.JSONDecodeError:
+                if scalar:
+                    raise ValueError("Malformed SearXNG results")
+                # Entry not fully received yet (close() reports truncation)
+                break
+            
+            completed.append(item)
+            self._after_item = True
+            pos = end
+        
+        self._text = text[pos:]
+        self._pos = 0
+        return completed
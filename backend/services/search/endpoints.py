@@ -0,0 +1,216 @@
+"""
+SearXNG Endpoint Pool
+Health-aware least-outstanding-requests balancing and hedging across replicas
+"""
+
+import random
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional, Sequence, Tuple
+
+from prometheus_client import Counter, Gauge
+
+SEARXNG_OUTSTANDING = Gauge(
+    "searxng_endpoint_outstanding_requests",
+    "Requests in flight to each SearXNG endpoint",
+    ["endpoint"],
+)
+
+SEARXNG_REQUESTS = Counter(
+    "searxng_endpoint_requests_total",
+    "Requests to each SearXNG endpoint by outcome (ok, failed)",
+    ["endpoint", "outcome"],
+)
+
+SEARXNG_EJECTIONS = Counter(
+    "searxng_endpoint_ejections_total",
+    "Times a SearXNG endpoint was taken out of rotation",
+    ["endpoint"],
+)
+
+SEARXNG_HEDGES = Counter(
+    "searxng_hedged_requests_total",
+    "Hedged SearXNG requests by which request answered first (primary, hedge)",
+    ["winner"],
+)
+
+
+class Endpoint:
+    """A SearXNG replica and its live statistics."""
+    
+    def __init__(self, url: str):
+        self.url = url.rstrip('/')
+        self.outstanding = 0
+        self.failures = 0
+        self.ejected_until = 0.0
+        self.latency = 0.0
+    
+    @property
+    def healthy(self) -> bool:
+        return self.ejected_until <= time.monotonic()
+
+
+class EndpointPool:
+    """
+    Routes requests across SearXNG replicas.
+    
+    Each request goes to the healthy endpoint with the fewest requests in
+    flight (ties go to the lower latency average, then at random), so a
+    replica slowed by a bad upstream engine naturally receives less traffic.
+    An endpoint failing ``failure_threshold`` times in a row is ejected for
+    ``ejection_time`` seconds; if every endpoint is ejected, the one due back
+    soonest is used rather than failing outright.
+    
+    The pool also tracks the p95 latency of successful requests, used as the
+    hedging delay, and caps hedges at ``max_hedge_ratio`` of requests so
+    hedging cannot double upstream load.
+    """
+    
+    def __init__(
+        self,
+        urls: Sequence[str],
+        failure_threshold: int = 3,
+        ejection_time: float = 30.0,
+        latency_window: int = 200,
+        min_hedge_samples: int = 20,
+        max_hedge_ratio: float = 0.1,
+    ):
+        """
+        Args:
+            urls: Endpoint base URLs
+            failure_threshold: Consecutive failures before an endpoint is ejected
+            ejection_time: Seconds an ejected endpoint is left out
+            latency_window: Recent successful requests used for the p95
+            min_hedge_samples: Samples needed before hedging starts
+            max_hedge_ratio: Maximum hedged requests as a fraction of all requests
+        """
+        if not urls:
+            raise ValueError("At least one SearXNG endpoint is required")
+        
+        self.endpoints = [Endpoint(url) for url in urls]
+        self.key = ",".join(endpoint.url for endpoint in self.endpoints)
+        self.failure_threshold = failure_threshold
+        self.ejection_time = ejection_time
+        self.min_hedge_samples = min_hedge_samples
+        self.max_hedge_ratio = max_hedge_ratio
+        
+        self._latencies: Deque[float] = deque(maxlen=latency_window)
+        self._p95: Optional[float] = None
+        self._samples_since_p95 = 0
+        self._requests = 0
+        self._hedges = 0
+    
+    def __len__(self) -> int:
+        return len(self.endpoints)
+    
+    def pick(self, exclude: Iterable[Endpoint] = ()) -> Optional[Endpoint]:
+        """
+        Choose an endpoint for the next request.
+        
+        Args:
+            exclude: Endpoints already serving this request (for hedges)
+        
+        Returns:
+            Endpoint, or None if every endpoint is excluded
+        """
+        candidates = [endpoint for endpoint in self.endpoints if endpoint not in exclude]
+        if not candidates:
+            return None
+        
+        healthy = [endpoint for endpoint in candidates if endpoint.healthy]
+        if not healthy:
+            return min(candidates, key=lambda endpoint: endpoint.ejected_until)
+        
+        return min(
+            healthy,
+            key=lambda endpoint: (endpoint.outstanding, endpoint.latency, random.random()),
+        )
+    
+    def acquire(self, endpoint: Endpoint) -> None:
+        """Count a request sent to endpoint (call as it is chosen)."""
+        endpoint.outstanding += 1
+        self._requests += 1
+        SEARXNG_OUTSTANDING.labels(endpoint.url).set(endpoint.outstanding)
+    
+    def release(self, endpoint: Endpoint) -> None:
+        """Count the end of a request to endpoint, whether finished or cancelled."""
+        endpoint.outstanding -= 1
+        SEARXNG_OUTSTANDING.labels(endpoint.url).set(endpoint.outstanding)
+    
+    def record(self, endpoint: Endpoint, latency: float, ok: bool) -> None:
+        """
+        Record how a completed request went.
+        
+        Args:
+            endpoint: Where the request went
+            latency: Seconds taken
+            ok: Whether the endpoint answered successfully
+        """
+        SEARXNG_REQUESTS.labels(endpoint.url, "ok" if ok else "failed").inc()
+        if not ok:
+            endpoint.failures += 1
+            if endpoint.failures >= self.failure_threshold and endpoint.healthy:
+                endpoint.ejected_until = time.monotonic() + self.ejection_time
+                SEARXNG_EJECTIONS.labels(endpoint.url).inc()
+            return
+        
+        endpoint.failures = 0
+        endpoint.ejected_until = 0.0
+        endpoint.latency = latency if endpoint.latency == 0.0 else 0.8 * endpoint.latency + 0.2 * latency
+        self._latencies.append(latency)
+        self._samples_since_p95 += 1
+    
+    def hedge_delay(self) -> Optional[float]:
+        """
+        Seconds to wait before hedging a request, or None not to hedge.
+        
+        Hedging needs a second endpoint, enough latency samples and room in
+        the hedge budget. The budget is only claimed when the hedge is sent
+        (see start_hedge).
+        """
+        if len(self.endpoints) < 2 or len(self._latencies) < self.min_hedge_samples:
+            return None
+        if self._hedges >= self._requests * self.max_hedge_ratio:
+            return None
+        
+        if self._p95 is None or self._samples_since_p95 >= 20:
+            ordered = sorted(self._latencies)
+            self._p95 = ordered[int(len(ordered) * 0.95) - 1]
+            self._samples_since_p95 = 0
+        return self._p95
+    
+    def start_hedge(self) -> bool:
+        """
+        Claim room in the hedge budget for a hedge about to be sent.
+        
+        Counting the hedge as it is sent, not when it finishes, keeps many
+        slow requests at once from all hedging past ``max_hedge_ratio``.
+        
+        Returns:
+            True if the hedge may be sent
+        """
+        if self._hedges >= self._requests * self.max_hedge_ratio:
+            return False
+        self._hedges += 1
+        return True
+    
+    def hedged(self, winner: str) -> None:
+        """Record which request answered a hedged search; 'primary' or 'hedge'."""
+        SEARXNG_HEDGES.labels(winner).inc()
+
+
+_pools: Dict[Tuple[str, ...], EndpointPool] = {}
+
+
+def get_endpoint_pool(urls: Sequence[str]) -> EndpointPool:
+    """
+    Get the process-wide pool for a set of endpoints.
+    
+    Service instances come and go per call, so balancing state (in-flight
+    counts, health, latency) lives in one pool per endpoint list.
+    """
+    key = tuple(url.rstrip('/') for url in urls)
+    pool = _pools.get(key)
+    if pool is None:
+        pool = _pools[key] = EndpointPool(list(key))
+    return pool
@@ -0,0 +1,148 @@
+"""
+SearXNG Result Cache
+Two-tier (in-process LRU + optional Redis) cache with stale-while-revalidate
+"""
+
+import hashlib
+import json
+import time
+import unicodedata
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from prometheus_client import Counter
+
+from app.core.cache import TwoTierCache
+
+SEARCH_CACHE_LOOKUPS = Counter(
+    "searxng_cache_lookups_total",
+    "SearXNG result cache lookups by result (fresh, stale, miss)",
+    ["result"],
+)
+
+# Seconds results stay fresh, by category; news and social results age fastest
+CATEGORY_TTLS = {
+    "general": 300,
+    "news": 60,
+    "social media": 60,
+    "it": 900,
+    "science": 3600,
+    "images": 3600,
+    "videos": 1800,
+    "music": 3600,
+    "files": 3600,
+    "map": 86400,
+}
+DEFAULT_TTL = 300
+
+
+class CachedSearch(NamedTuple):
+    """A cache hit; stale results should be refreshed in the background."""
+    results: Dict[str, Any]
+    stale: bool
+
+
+def copy_results(results: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copy a result page deep enough for callers to edit it.
+    
+    The page and each result item are copied (ai_focused_search rewrites
+    both); values nested inside items are shared and must not be mutated.
+    """
+    copied = dict(results)
+    if isinstance(copied.get("results"), list):
+        copied["results"] = [dict(item) for item in copied["results"]]
+    return copied
+
+
+class SearchResultCache:
+    """
+    Cache of SearXNG result pages keyed on normalised search parameters.
+    
+    Entries are fresh for their category's TTL and then served stale for up
+    to ``stale_factor`` times as long while the caller refreshes them, so a
+    repeated search never waits on SearXNG unless its results are very old.
+    With ``redis_tier`` the cache is shared by every process.
+    """
+    
+    def __init__(
+        self,
+        maxsize: int = 2048,
+        redis_tier: bool = False,
+        category_ttls: Optional[Dict[str, float]] = None,
+        stale_factor: float = 1.0,
+    ):
+        """
+        Args:
+            maxsize: Maximum result pages kept in process
+            redis_tier: Also keep results in Redis
+            category_ttls: Fresh TTL per category (defaults to CATEGORY_TTLS)
+            stale_factor: Stale window as a multiple of the fresh TTL
+        """
+        self.category_ttls = CATEGORY_TTLS if category_ttls is None else category_ttls
+        self.stale_factor = stale_factor
+        self._cache = TwoTierCache(
+            "searxng",
+            maxsize=maxsize,
+            redis_tier=redis_tier,
+            broadcast=False,
+            encode=lambda entry: json.dumps(entry, separators=(",", ":")).encode(),
+            decode=json.loads,
+        )
+    
+    @staticmethod
+    def key(
+        query: str,
+        category: str,
+        language: str,
+        engines: Optional[List[str]],
+        format: str,
+        pageno: int = 1,
+    ) -> str:
+        """
+        Build a cache key from search parameters.
+        
+        Whitespace, case and Unicode form of the query are normalised and
+        engines are order-insensitive, so equivalent searches share an entry.
+        Each result page has its own entry.
+        """
+        normalised = (
+            " ".join(unicodedata.normalize("NFKC", query).casefold().split()),
+            category.strip().lower(),
+            language.strip().lower(),
+            sorted({engine.strip().lower() for engine in engines or ()}),
+            format.strip().lower(),
+            pageno,
+        )
+        return hashlib.blake2b(
+            json.dumps(normalised, separators=(",", ":")).encode(), digest_size=16
+        ).hexdigest()
+    
+    def ttl(self, category: str) -> float:
+        """Fresh TTL for a category."""
+        return self.category_ttls.get(category.strip().lower(), DEFAULT_TTL)
+    
+    async def get(self, key: str) -> Optional[CachedSearch]:
+        """
+        Look up a result page.
+        
+        Returns:
+            CachedSearch with a private copy of the page, or None on a miss
+        """
+        entry = await self._cache.get("results", key)
+        if entry is None:
+            SEARCH_CACHE_LOOKUPS.labels("miss").inc()
+            return None
+        
+        stale = entry["fresh_until"] <= time.time()
+        SEARCH_CACHE_LOOKUPS.labels("stale" if stale else "fresh").inc()
+        return CachedSearch(copy_results(entry["results"]), stale)
+    
+    async def set(self, key: str, category: str, results: Dict[str, Any]) -> None:
+        """Store a result page for its category's TTL plus the stale window."""
+        ttl = self.ttl(category)
+        entry = {"fresh_until": time.time() + ttl, "results": copy_results(results)}
+        await self._cache.set("results", key, entry, ttl * (1 + self.stale_factor))
+
+
+# Process-wide cache shared by SearXNGService instances
+search_cache = SearchResultCache()
@@ -0,0 +1,178 @@
+"""
+SearXNG Relevance Scoring
+Keyword scorers and top-k selection for ranking search results
+"""
+
+import heapq
+from itertools import compress
+from typing import Any, Callable, Dict, List, Mapping, Optional, Protocol, Sequence, Tuple, Union
+
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - optional dependency
+    ahocorasick = None
+
+# Searched fields and their weights when none are given
+DEFAULT_FIELD_WEIGHTS = {"title": 1, "content": 1}
+
+# Keyword count from which one Aho-Corasick pass beats a substring check per keyword
+AUTOMATON_MIN_KEYWORDS = 40
+
+# Keywords the AI-focused search ranks by
+AI_KEYWORDS = [
+    'ai', 'machine learning', 'neural network', 'deep learning',
+    'python', 'tensorflow', 'pytorch', 'github', 'api'
+]
+
+
+class Scorer(Protocol):
+    """Scores a batch of search results; higher is more relevant, 0 is irrelevant."""
+    
+    def score(self, results: Sequence[Dict[str, Any]]) -> List[float]:
+        ...
+
+
+class KeywordScorer:
+    """
+    Scores results by the keywords found in their text fields.
+    
+    Each keyword found in a result counts once: its weight times the weight
+    of the highest-weighted field it appears in. Matching is case-insensitive
+    and by substring, like ``keyword in text``.
+    
+    Scores are ints when every weight is a whole number (the default), so
+    plain keyword counts keep their integer form.
+    
+    Fields of equal weight are searched as one string. Large keyword sets
+    are matched in a single pass by an Aho-Corasick automaton when
+    pyahocorasick is installed; otherwise (and for small sets, where it is
+    faster) each keyword is a C substring search.
+    """
+    
+    def __init__(
+        self,
+        keywords: Union[Sequence[str], Mapping[str, float]],
+        field_weights: Optional[Mapping[str, float]] = None,
+        use_automaton: Optional[bool] = None,
+    ):
+        """
+        Args:
+            keywords: Keywords (weight 1 each) or keyword to weight
+            field_weights: Field to weight (defaults to DEFAULT_FIELD_WEIGHTS)
+            use_automaton: Force Aho-Corasick on or off; by default it is used
+                for AUTOMATON_MIN_KEYWORDS keywords or more, if installed
+        """
+        if not isinstance(keywords, Mapping):
+            keywords = dict.fromkeys(keywords, 1)
+        if not keywords:
+            raise ValueError("At least one keyword is required")
+        
+        weights: Dict[str, float] = {}
+        for keyword, weight in keywords.items():
+            weights[keyword.lower()] = _weight(weight)
+        self.keywords = weights
+        
+        # Highest weight first, so a keyword is credited to its best field
+        groups: Dict[float, List[str]] = {}
+        for field, field_weight in (field_weights or DEFAULT_FIELD_WEIGHTS).items():
+            groups.setdefault(_weight(field_weight), []).append(field)
+        self._groups: List[Tuple[float, Callable[[Dict[str, Any]], str]]] = [
+            (field_weight, _text_getter(fields))
+            for field_weight, fields in sorted(groups.items(), reverse=True)
+            if field_weight > 0
+        ]
+        
+        self._table: Tuple[Tuple[str, float], ...] = tuple(weights.items())
+        self._keywords = tuple(weights)
+        self._weights = tuple(weights.values())
+        if use_automaton is None:
+            use_automaton = ahocorasick is not None and len(weights) >= AUTOMATON_MIN_KEYWORDS
+        if use_automaton and ahocorasick is None:
+            raise RuntimeError("pyahocorasick is not installed")
+        
+        self._automaton = None
+        if use_automaton:
+            self._automaton = ahocorasick.Automaton()
+            for keyword, weight in self._table:
+                self._automaton.add_word(keyword, (keyword, weight))
+            self._automaton.make_automaton()
+    
+    def score(self, results: Sequence[Dict[str, Any]]) -> List[float]:
+        """
+        Score a batch of results.
+        
+        Args:
+            results: SearXNG result entries
+        
+        Returns:
+            Score per result, in order
+        """
+        if self._automaton is None and len(self._groups) == 1:
+            # Common case: one pass of substring checks over all fields
+            field_weight, text_of = self._groups[0]
+            keywords = self._keywords
+            weights = self._weights
+            return [
+                sum(compress(weights, map(text_of(result).__contains__, keywords))) * field_weight
+                for result in results
+            ]
+        
+        return [self.score_one(result) for result in results]
+    
+    def score_one(self, result: Dict[str, Any]) -> float:
+        """Score a single result."""
+        seen = set()
+        score = 0
+        for field_weight, text_of in self._groups:
+            text = text_of(result)
+            if not text:
+                continue
+            
+            for keyword, weight in self._matches(text):
+                if keyword not in seen:
+                    seen.add(keyword)
+                    score += weight * field_weight
+        return score
+    
+    def _matches(self, text: str):
+        if self._automaton is not None:
+            return {match for _, match in self._automaton.iter(text)}
+        return compress(self._table, map(text.__contains__, self._keywords))
+
+
+def _weight(value: float) -> float:
+    """Whole-number weights as ints, so integer scores stay ints."""
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def _text_getter(fields: Sequence[str]) -> Callable[[Dict[str, Any]], str]:
+    """Lowercased text of fields, separated so no keyword spans two of them."""
+    if len(fields) == 1:
+        field, = fields
+        return lambda result: f"{result.get(field) or ''}".lower()
+    if len(fields) == 2:
+        first, second = fields
+        return lambda result: f"{result.get(first) or ''}\0{result.get(second) or ''}".lower()
+    return lambda result: '\0'.join([f"{result.get(field) or ''}" for field in fields]).lower()
+
+
+def top_k(
+    results: Sequence[Dict[str, Any]],
+    scores: Sequence[float],
+    k: int,
+) -> List[Tuple[float, Dict[str, Any]]]:
+    """
+    Select the k highest-scoring results with a positive score.
+    
+    Ties keep page order, as a stable sort would.
+    
+    Returns:
+        (score, result) pairs, best first
+    """
+    relevant = [(score, result) for score, result in zip(scores, results) if score > 0]
+    return heapq.nlargest(k, relevant, key=lambda pair: pair[0])
+
+
+# Default scorer for ai_focused_search
+ai_relevance_scorer = KeywordScorer(AI_KEYWORDS)
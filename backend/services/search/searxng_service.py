@@ -6,28 +6,81 @@ Provides search capabilities for LUXOR AI CUA platform
 import asyncio
 import aiohttp
 import json
-from typing import List, Dict, Optional, Any
+import time
+from typing import List, Dict, Optional, Any, AsyncIterator, NamedTuple, Sequence, Tuple, Union
 from urllib.parse import urlencode
 import logging
 
+from app.core.http_client import SharedHTTPSession
+from app.core.request_context import outbound_headers
+from app.core.singleflight import SingleFlight
+from services.search.decoding import ResultStreamDecoder, decode_page
+from services.search.endpoints import Endpoint, get_endpoint_pool
+from services.search.result_cache import SearchResultCache, copy_results, search_cache
+from services.search.scoring import Scorer, ai_relevance_scorer, top_k
+
 logger = logging.getLogger(__name__)
 
+# Connection pool shared by every SearXNGService; opened and closed by the app lifespan
+searxng_http = SharedHTTPSession(
+    "searxng",
+    limit_per_host=32,
+    connect_timeout=3.0,
+    read_timeout=15.0,
+    total_timeout=30.0,
+    headers={'User-Agent': 'LUXOR-AI-CUA/1.0'}
+)
+
+# Concurrent identical searches (from any service instance) share one request
+_search_flights: SingleFlight[Dict[str, Any]] = SingleFlight("searxng_search")
+
+# Background refreshes of stale cache entries, by flight key
+_refreshes: Dict[Tuple[Any, ...], asyncio.Task] = {}
+
+class SearXNGError(Exception):
+    """A search failed (raised by the streaming API)"""
+
+class SearchOutcome(NamedTuple):
+    """One query's page from search_many or search_pages; error is set instead of results on failure"""
+    query: str
+    pageno: int
+    results: Optional[Dict[str, Any]]
+    error: Optional[str]
+    
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
 class SearXNGService:
     """SearXNG Privacy-focused Search Service"""
     
-    def __init__(self, base_url: str = "http://localhost:8080"):
-        self.base_url = base_url.rstrip('/')
-        self.session = None
-        
+    def __init__(
+        self,
+        base_url: Union[str, Sequence[str]] = "http://localhost:8080",
+        cache: Optional[SearchResultCache] = search_cache,
+        http: SharedHTTPSession = searxng_http,
+        hedge: bool = True
+    ):
+        """
+        Args:
+            base_url: SearXNG instance URL, or the URLs of several replicas
+            cache: Result cache (shared by default); None disables caching
+            http: Connection pool (shared by default)
+            hedge: With several replicas, re-send a search that is slower
+                than the p95 to a second replica and use the first answer
+        """
+        urls = [base_url] if isinstance(base_url, str) else list(base_url)
+        self.pool = get_endpoint_pool(urls)
+        self.base_url = self.pool.endpoints[0].url
+        self.cache = cache
+        self.http = http
+        self.hedge = hedge
+        # Only instances that fetch and store alike may share a flight
+        self._flight_scope = (self.pool.key, id(cache), hedge)
+    
     async def _get_session(self) -> aiohttp.ClientSession:
-        """Get or create HTTP session"""
-        if self.session is None or self.session.closed:
-            timeout = aiohttp.ClientTimeout(total=30)
-            self.session = aiohttp.ClientSession(
-                timeout=timeout,
-                headers={'User-Agent': 'LUXOR-AI-CUA/1.0'}
-            )
-        return self.session
+        """Get the shared HTTP session"""
+        return self.http.session
     
     async def search(
         self, 
@@ -35,7 +88,8 @@ class SearXNGService:
         category: str = "general",
         language: str = "auto",
         format: str = "json",
-        engines: Optional[List[str]] = None
+        engines: Optional[List[str]] = None,
+        pageno: int = 1
     ) -> Dict[str, Any]:
         """
         Perform privacy-focused search using SearXNG
@@ -46,43 +100,350 @@ class SearXNGService:
             language: Search language preference
             format: Response format (json, html)
             engines: Specific engines to use
-            
+            pageno: Result page, from 1
+        
         Returns:
             Dictionary containing search results
         """
+        params = self._params(query, category, language, format, engines, pageno)
+        key = SearchResultCache.key(query, category, language, engines, format, pageno)
+        
+        # Serve repeated searches from cache; refresh stale ones in the background
+        if self.cache is not None:
+            cached = await self.cache.get(key)
+            if cached is not None:
+                if cached.stale:
+                    self._refresh(key, params)
+                return cached.results
+        
+        # Callers share the result, so each gets its own copy to edit
+        results = await _search_flights.do((*self._flight_scope, key), self._fetch_and_store, key, params)
+        return copy_results(results)
+    
+    async def search_stream(
+        self,
+        query: str,
+        category: str = "general",
+        language: str = "auto",
+        engines: Optional[List[str]] = None,
+        pageno: int = 1
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield search results as soon as each is decoded
+        
+        Results can be ranked while the rest of the page is still arriving.
+        Cached pages are replayed; otherwise the page is streamed from the
+        least busy replica (without hedging) and cached once complete. To
+        stop early, iterate inside ``contextlib.aclosing`` so the request is
+        released at once.
+        
+        Args:
+            query: Search query string
+            category: Search category (general, images, videos, etc.)
+            language: Search language preference
+            engines: Specific engines to use
+            pageno: Result page, from 1
+        
+        Yields:
+            Result entries in page order
+        
+        Raises:
+            SearXNGError: If the search fails
+        """
+        params = self._params(query, category, language, 'json', engines, pageno)
+        key = SearchResultCache.key(query, category, language, engines, 'json', pageno)
+        
+        if self.cache is not None:
+            cached = await self.cache.get(key)
+            if cached is not None:
+                if cached.stale:
+                    self._refresh(key, params)
+                for result in cached.results.get('results', []):
+                    yield result
+                return
+        
+        endpoint = self.pool.pick()
+        self.pool.acquire(endpoint)
+        start = time.perf_counter()
         try:
             session = await self._get_session()
+            async with session.get(
+                f"{endpoint.url}/search", params=params, headers=outbound_headers()
+            ) as response:
+                if response.status != 200:
+                    self.pool.record(endpoint, time.perf_counter() - start, response.status < 500)
+                    raise SearXNGError(f'Search failed with status {response.status}')
+                
+                decoder = ResultStreamDecoder()
+                async for chunk in response.content.iter_any():
+                    for result in decoder.feed(chunk):
+                        # The page is cached afterwards; callers get their own copy
+                        yield dict(result)
+                page = decoder.close()
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            self.pool.record(endpoint, time.perf_counter() - start, False)
+            logger.error(f"SearXNG search error on {endpoint.url}: {str(e)}")
+            raise SearXNGError(str(e)) from e
+        finally:
+            self.pool.release(endpoint)
+        
+        self.pool.record(endpoint, time.perf_counter() - start, True)
+        if self.cache is not None:
+            await self.cache.set(key, category, page)
+    
+    async def search_many(
+        self,
+        queries: Sequence[str],
+        category: str = "general",
+        language: str = "auto",
+        engines: Optional[List[str]] = None,
+        pageno: int = 1,
+        concurrency: int = 4
+    ) -> List[SearchOutcome]:
+        """
+        Run several searches concurrently
+        
+        Args:
+            queries: Search query strings
+            category: Search category for every query
+            language: Search language preference
+            engines: Specific engines to use
+            pageno: Result page, from 1
+            concurrency: Maximum searches in flight at once
+        
+        Returns:
+            One outcome per query, in the order given; a failed query has
+            its own error and does not affect the others
+        
+        Raises:
+            ValueError: If concurrency is less than 1
+        """
+        if concurrency < 1:
+            raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def run(query: str) -> SearchOutcome:
+            async with semaphore:
+                return await self._search_outcome(query, category, language, engines, pageno)
+        
+        return await asyncio.gather(*(run(query) for query in queries))
+    
+    async def search_pages(
+        self,
+        query: str,
+        max_pages: int = 5,
+        category: str = "general",
+        language: str = "auto",
+        engines: Optional[List[str]] = None
+    ) -> AsyncIterator[SearchOutcome]:
+        """
+        Yield successive result pages of one search
+        
+        The next page is fetched while the caller works on the current one.
+        Iteration ends after max_pages, an empty page or a failed page (which
+        is yielded). To stop early, iterate inside ``contextlib.aclosing``
+        so the prefetch is cancelled at once.
+        
+        Args:
+            query: Search query string
+            max_pages: Maximum pages to fetch
+            category: Search category (general, images, videos, etc.)
+            language: Search language preference
+            engines: Specific engines to use
+        
+        Yields:
+            One outcome per page, in page order
+        """
+        def fetch(pageno: int) -> asyncio.Task:
+            return asyncio.create_task(
+                self._search_outcome(query, category, language, engines, pageno)
+            )
+        
+        upcoming = fetch(1) if max_pages > 0 else None
+        try:
+            for pageno in range(1, max_pages + 1):
+                outcome = await upcoming
+                upcoming = None
+                if outcome.ok and outcome.results.get('results') and pageno < max_pages:
+                    upcoming = fetch(pageno + 1)
+                
+                yield outcome
+                if upcoming is None:
+                    return
+        finally:
+            if upcoming is not None:
+                upcoming.cancel()
+    
+    async def _search_outcome(
+        self,
+        query: str,
+        category: str,
+        language: str,
+        engines: Optional[List[str]],
+        pageno: int
+    ) -> SearchOutcome:
+        """Run one JSON search, reporting failure as the outcome's error"""
+        try:
+            results = await self.search(query, category, language, 'json', engines, pageno)
+        except Exception as e:
+            logger.error(f"SearXNG search error: {str(e)}")
+            return SearchOutcome(query, pageno, None, str(e))
+        
+        if 'error' in results:
+            return SearchOutcome(query, pageno, None, results['error'])
+        return SearchOutcome(query, pageno, results, None)
+    
+    @staticmethod
+    def _params(
+        query: str,
+        category: str,
+        language: str,
+        format: str,
+        engines: Optional[List[str]],
+        pageno: int = 1
+    ) -> Dict[str, str]:
+        """Build SearXNG query parameters"""
+        params = {
+            'q': query,
+            'category': category,
+            'language': language,
+            'format': format
+        }
+        
+        if engines:
+            params['engines'] = ','.join(engines)
+        if pageno != 1:
+            params['pageno'] = str(pageno)
+        return params
+    
+    async def _fetch_and_store(self, key: str, params: Dict[str, str]) -> Dict[str, Any]:
+        """Fetch a search and cache successful results"""
+        results = await self._fetch(params)
+        if self.cache is not None and 'error' not in results:
+            await self.cache.set(key, params['category'], results)
+        return results
+    
+    async def _fetch(self, params: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Send one search to the least busy replica.
+        
+        If it is still running after the pool's p95 latency (and the hedge
+        budget allows), the search is also sent to a second replica; a replica
+        that fails is retried once on another. The first good answer wins and
+        the other request is cancelled.
+        """
+        primary = self.pool.pick()
+        attempts = [self._attempt(primary, params)]
+        hedged = False
+        try:
+            delay = self.pool.hedge_delay() if self.hedge else None
+            if delay is not None:
+                await asyncio.wait(attempts, timeout=delay)
+                if not attempts[0].done() and self.pool.start_hedge():
+                    backup = self.pool.pick(exclude=(primary,))
+                    attempts.append(self._attempt(backup, params))
+                    hedged = True
             
-            # Prepare search parameters
-            params = {
-                'q': query,
-                'category': category,
-                'language': language,
-                'format': format
-            }
+            pending = set(attempts)
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((task for task in done if 'error' not in task.result()[0]), None)
+                if winner is not None:
+                    break
+                if pending:
+                    # The other request may still succeed
+                    continue
+                
+                winner = done.pop()
+                backup = self.pool.pick(exclude=(primary,)) if len(attempts) == 1 else None
+                if winner.result()[1] or backup is None:
+                    break
+                # The replica failed; try another once
+                attempts.append(self._attempt(backup, params))
+                pending = {attempts[-1]}
             
-            if engines:
-                params['engines'] = ','.join(engines)
+            if hedged:
+                self.pool.hedged("primary" if winner is attempts[0] else "hedge")
+            return winner.result()[0]
+        finally:
+            for task in attempts:
+                task.cancel()
+    
+    def _attempt(self, endpoint: Endpoint, params: Dict[str, str]) -> asyncio.Task:
+        """Start a request to a replica, counting it as in flight straight away"""
+        self.pool.acquire(endpoint)
+        task = asyncio.create_task(self._fetch_from(endpoint, params))
+        task.add_done_callback(lambda _: self.pool.release(endpoint))
+        return task
+    
+    async def _fetch_from(self, endpoint: Endpoint, params: Dict[str, str]) -> Tuple[Dict[str, Any], bool]:
+        """
+        Send one search request to a SearXNG replica
+        
+        Returns:
+            Results (or error), and whether the replica itself was healthy
+        """
+        start = time.perf_counter()
+        try:
+            session = await self._get_session()
             
             # Make search request
-            search_url = f"{self.base_url}/search"
+            search_url = f"{endpoint.url}/search"
             
-            async with session.get(search_url, params=params) as response:
+            async with session.get(search_url, params=params, headers=outbound_headers()) as response:
                 if response.status == 200:
-                    if format == 'json':
-                        return await response.json()
+                    if params['format'] == 'json':
+                        # orjson when installed; large pages decode off the event loop
+                        results = await decode_page(await response.read())
                     else:
-                        return {'html': await response.text()}
+                        results = {'html': await response.text()}
                 else:
-                    logger.error(f"SearXNG search failed: {response.status}")
-                    return {'error': f'Search failed with status {response.status}'}
-                    
+                    logger.error(f"SearXNG search failed on {endpoint.url}: {response.status}")
+                    results = {'error': f'Search failed with status {response.status}'}
+            
+            # Client errors would fail on any replica
+            endpoint_ok = response.status < 500
+            self.pool.record(endpoint, time.perf_counter() - start, endpoint_ok)
+            return results, endpoint_ok
+        
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-            logger.error(f"SearXNG search error: {str(e)}")
-            return {'error': str(e)}
+            self.pool.record(endpoint, time.perf_counter() - start, False)
+            logger.error(f"SearXNG search error on {endpoint.url}: {str(e)}")
+            return {'error': str(e)}, False
+    
+    def _refresh(self, key: str, params: Dict[str, str]) -> None:
+        """Re-fetch a stale cache entry without making the caller wait"""
+        flight_key = (*self._flight_scope, key)
+        if flight_key in _refreshes:
+            return
+        
+        task = asyncio.create_task(
+            _search_flights.do(flight_key, self._fetch_and_store, key, params)
+        )
+        _refreshes[flight_key] = task
+        task.add_done_callback(lambda _: _refreshes.pop(flight_key, None))
     
-    async def ai_focused_search(self, query: str) -> Dict[str, Any]:
-        """Perform AI and development focused search"""
+    async def ai_focused_search(
+        self,
+        query: str,
+        scorer: Scorer = ai_relevance_scorer,
+        limit: int = 10
+    ) -> Dict[str, Any]:
+        """
+        Perform AI and development focused search
+        
+        Args:
+            query: Search query string
+            scorer: Relevance scorer (AI keywords by default)
+            limit: Maximum results returned
+        
+        Returns:
+            The most relevant results, best first, each with its
+            ``ai_relevance_score``
+        """
         ai_engines = ['google', 'github', 'stackoverflow', 'arxiv']
         
         results = await self.search(
@@ -93,34 +454,15 @@ class SearXNGService:
         
         # Filter results for AI relevance
         if 'results' in results:
-            filtered_results = []
-            ai_keywords = [
-                'ai', 'machine learning', 'neural network', 'deep learning',
-                'python', 'tensorflow', 'pytorch', 'github', 'api'
-            ]
+            scores = scorer.score(results['results'])
             
-            for result in results['results']:
-                title = result.get('title', '').lower()
-                content = result.get('content', '').lower()
-                
-                # Score based on AI relevance
-                relevance_score = sum(
-                    1 for keyword in ai_keywords 
-                    if keyword in title or keyword in content
-                )
-                
-                if relevance_score > 0:
-                    result['ai_relevance_score'] = relevance_score
-                    filtered_results.append(result)
+            ranked = []
+            for score, result in top_k(results['results'], scores, limit):
+                result['ai_relevance_score'] = score
+                ranked.append(result)
             
-            # Sort by relevance
-            filtered_results.sort(
-                key=lambda x: x.get('ai_relevance_score', 0), 
-                reverse=True
-            )
-            
-            results['results'] = filtered_results[:10]
-            results['total_ai_filtered'] = len(filtered_results)
+            results['results'] = ranked
+            results['total_ai_filtered'] = sum(1 for score in scores if score > 0)
         
         return results
     
@@ -144,19 +486,27 @@ class SearXNGService:
         )
     
     async def health_check(self) -> bool:
-        """Check if SearXNG service is available"""
+        """Check if any SearXNG replica is available"""
+        checks = await asyncio.gather(*(
+            self._check_endpoint(endpoint) for endpoint in self.pool.endpoints
+        ))
+        return any(checks)
+    
+    async def _check_endpoint(self, endpoint: Endpoint) -> bool:
         try:
             session = await self._get_session()
-            async with session.get(f"{self.base_url}/") as response:
+            async with session.get(f"{endpoint.url}/", headers=outbound_headers()) as response:
                 return response.status == 200
         except Exception as e:
-            logger.error(f"SearXNG health check failed: {str(e)}")
+            logger.error(f"SearXNG health check failed for {endpoint.url}: {str(e)}")
             return False
     
     async def close(self):
-        """Close the HTTP session"""
-        if self.session and not self.session.closed:
-            await self.session.close()
+        """Wait for background cache refreshes (the shared session stays open)"""
+        scope = len(self._flight_scope)
+        pending = [task for flight_key, task in _refreshes.items() if flight_key[:scope] == self._flight_scope]
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
     
     async def __aenter__(self):
         return self
@@ -180,6 +530,8 @@ async def main():
         # Perform code search
         code_results = await search.code_search("fastapi authentication", "python")
         print(f"Found {len(code_results.get('results', []))} code examples")
+    
+    await searxng_http.stop()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file